@@ -17,20 +17,45 @@ Usage
 
 The script creates **reportX.xlsx** in the same folder, with the main
 "Activity Report" sheet plus one sheet per manager.
+
+With `--per-manager` it instead writes the master (Activity Report only)
+plus one workbook per manager under `reportX_managers/`, each produced by
+its own worker process (`--workers N` to cap the pool).
+
+With `--table` the rows are written only once, as an Excel Table with
+autofilter, plus a "Managers" index sheet linking to each manager's block.
+
+Unchanged inputs are skipped: the selected AE/PT/P files, the output options
+and this script are fingerprinted into `reportX.xlsx.fingerprint.json`, and
+a run whose fingerprint matches exits without touching the workbook (so an
+open copy stays locked only by its reader).  Pass `--force` to rebuild.
+
+`--update` keeps the existing workbook and rewrites only the manager tabs
+whose content hash changed (plus those managers' rows on the main sheet).
+
+Every run also writes columnar copies for fast downstream reads:
+`reportX.parquet` plus `reportX_managers/<manager>.parquet`
+(`--columnar arrow` for Arrow IPC, `--columnar none` to skip).
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 import polars as pl
 import pandas as pd
+from openpyxl import load_workbook  # type: ignore
 from openpyxl.formatting.rule import DataBar, FormatObject, Rule  # type: ignore
 from openpyxl.styles import Font, PatternFill  # type: ignore
+from openpyxl.utils import get_column_letter  # type: ignore
+from openpyxl.worksheet.table import Table, TableStyleInfo  # type: ignore
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Optional shim: keep legacy code working on older Polars
@@ -92,37 +117,108 @@ def safe_read(path: Path) -> pl.DataFrame:
         return pl.DataFrame()
 
 
+REPORT_NAME = "reportX.xlsx"
+
+
 def latest_file(folder: Path, tag: str) -> Optional[Path]:
     """Return most‑recent file containing *tag* (AE / PT / P)."""
     files: list[Path] = []
     for pattern in ["*.csv", "*.xlsx", "*.xls", "*.txt", "*.dat"]:
-        files.extend(folder.glob(f"*{tag}*{pattern}"))
-    # drop temp Excel locks
-    files = [p for p in files if not p.name.startswith("~$")]
+        files.extend(folder.glob(f"*{tag}{pattern}"))
+    # drop temp Excel locks and our own output (Windows globs are case‑blind)
+    report_stem = Path(REPORT_NAME).stem.lower()
+    files = [p for p in files if not p.name.startswith("~$") and not p.stem.lower().startswith(report_stem)]
     return max(files, key=lambda p: p.stat().st_mtime) if files else None
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Main
+# Skip‑if‑unchanged fingerprint
 # ──────────────────────────────────────────────────────────────────────────────
 
-def main(folder: str):
-    root = Path(folder).expanduser().resolve()
-    if not root.exists():
-        raise SystemExit(f"Folder not found: {root}")
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-    print("Using source folder:", root)
 
-    ae_path = latest_file(root, "AE")
-    pt_path = latest_file(root, "PT")
-    p_path = latest_file(root, "P")
+def run_fingerprint(inputs: dict[str, Optional[Path]], config: dict) -> str:
+    """Hash of the selected input files' contents, the output options and this script."""
+    payload = {
+        "inputs": {tag: [p.name, file_digest(p)] if p else None for tag, p in inputs.items()},
+        "config": config,
+        "pipeline": file_digest(Path(__file__)),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint_path(out_path: Path) -> Path:
+    return out_path.with_name(out_path.name + ".fingerprint.json")
+
+
+def read_sidecar(out_path: Path) -> dict:
+    """Previous run's fingerprint record, or {} if missing / unreadable."""
+    try:
+        return json.loads(fingerprint_path(out_path).read_text())
+    except (OSError, ValueError):
+        return {}
 
-    for lbl, p in (("AE", ae_path), ("PT", pt_path), ("P", p_path)):
-        print(f"  {lbl}:", p.name if p else "❌ none found")
 
-    AE = safe_read(ae_path) if ae_path else pl.DataFrame()
-    PT = safe_read(pt_path) if pt_path else pl.DataFrame()
-    P = safe_read(p_path) if p_path else pl.DataFrame()
+def output_stat(out_path: Path) -> Optional[list[int]]:
+    """[mtime_ns, size] of the written workbook, or None if it is missing."""
+    try:
+        stat = out_path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def output_untouched(out_path: Path, record: dict) -> bool:
+    """True if the workbook is still the one the recorded run wrote – not
+    overwritten (e.g. by calculations.py) or edited and saved in Excel since."""
+    return output_stat(out_path) is not None and record.get("output") == output_stat(out_path)
+
+
+def is_up_to_date(out_path: Path, fingerprint: str, sidecars: tuple[Path, ...] = ()) -> bool:
+    """Same fingerprint, the workbook as that run left it, and every *sidecars* file present."""
+    record = read_sidecar(out_path)
+    return (record.get("fingerprint") == fingerprint and output_untouched(out_path, record)
+            and all(p.exists() for p in sidecars))
+
+
+def save_fingerprint(out_path: Path, fingerprint: str, inputs: dict[str, Optional[Path]],
+                     sheets: Optional[dict[str, str]] = None):
+    """Record the run fingerprint and the workbook's stat as written;
+    *sheets* (name → content hash) feeds ``--update``."""
+    record = {
+        "fingerprint": fingerprint,
+        "inputs": {tag: p.name if p else None for tag, p in inputs.items()},
+        "output": output_stat(out_path),
+    }
+    if sheets:
+        record["sheets"] = sheets
+    fingerprint_path(out_path).write_text(json.dumps(record, indent=2))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Report build
+# ──────────────────────────────────────────────────────────────────────────────
+
+def source_files(root: Path) -> dict[str, Optional[Path]]:
+    """The latest AE, PT and P file in *root* (None where a type is missing)."""
+    return {tag: latest_file(root, tag) for tag in ("AE", "PT", "P")}
+
+
+def build_report(inputs: dict[str, Optional[Path]]) -> pl.DataFrame:
+    """AE extract ⋈ PT cost ⋈ P manager → the sorted Activity Report frame.
+
+    Raises ValueError when there is no AE data or nothing to report.  Shared
+    by :func:`main` and the Streamlit explorer's live mode.
+    """
+    AE = safe_read(inputs["AE"]) if inputs["AE"] else pl.DataFrame()
+    PT = safe_read(inputs["PT"]) if inputs["PT"] else pl.DataFrame()
+    P = safe_read(inputs["P"]) if inputs["P"] else pl.DataFrame()
 
     # ── project → manager mapping ─────────────────
     project_manager: dict[str, str] = {}
@@ -143,7 +239,7 @@ def main(folder: str):
         "Estimated Cost",
     ]
     if AE.is_empty():
-        raise SystemExit("No AE data – aborting.")
+        raise ValueError("No AE data – aborting.")
 
     cols_map = {req: find_col(AE, req) for req in required}
     AE_EX = pl.DataFrame({
@@ -204,80 +300,393 @@ def main(folder: str):
     FINAL = FINAL.sort(sort_cols)
 
     if FINAL.is_empty():
-        raise SystemExit("No data to write.")
+        raise ValueError("No data to write.")
+    return FINAL
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Main
+# ──────────────────────────────────────────────────────────────────────────────
+
+def main(folder: str, per_manager: bool = False, workers: Optional[int] = None,
+         table: bool = False, manager_index: bool = True, force: bool = False,
+         update: bool = False, columnar: str = "parquet"):
+    root = Path(folder).expanduser().resolve()
+    if not root.exists():
+        raise SystemExit(f"Folder not found: {root}")
+
+    print("Using source folder:", root)
+
+    inputs = source_files(root)
+    for lbl, p in inputs.items():
+        print(f"  {lbl}:", p.name if p else "❌ none found")
+
+    out_path = root / REPORT_NAME
+    config = {"per_manager": per_manager, "table": table, "manager_index": manager_index, "columnar": columnar}
+    fingerprint = run_fingerprint(inputs, config)
+    sidecars = () if columnar == "none" else (out_path.with_suffix(COLUMNAR_EXT[columnar]),)
+    if not force and is_up_to_date(out_path, fingerprint, sidecars):
+        print(f"⏭  Inputs unchanged since last run – {out_path.name} left as is (use --force to rebuild).")
+        return
 
-    write_excel(FINAL.to_pandas(), root / "reportX.xlsx")
+    try:
+        FINAL = build_report(inputs)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
+    sheet_hashes = None
+    if table:
+        write_excel_table(FINAL.to_pandas(), out_path, manager_index)
+    elif per_manager:
+        write_excel_per_manager(FINAL.to_pandas(), out_path, workers)
+    elif update:
+        sheet_hashes = update_excel(FINAL.to_pandas(), out_path, read_sidecar(out_path))
+    else:
+        sheet_hashes = write_excel(FINAL.to_pandas(), out_path)
+    if columnar != "none":
+        write_columnar(FINAL, out_path, columnar)
+    save_fingerprint(out_path, fingerprint, inputs, sheet_hashes)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Excel output + formatting
 # ──────────────────────────────────────────────────────────────────────────────
 
-def write_excel(df: pd.DataFrame, out_path: Path):
+def manager_sheet_name(mgr) -> str:
+    """Excel‑safe sheet name for a manager (max 31 chars, no []:*?/\\)."""
+    if pd.isna(mgr) or mgr == "Unknown Manager":
+        return "Unknown Manager"
+    return str(mgr)[:30].translate(str.maketrans("/\\?*[]:", "_______"))
+
+
+def file_stem(name: str) -> str:
+    """Windows‑safe file name stem for a sheet / manager name."""
+    return re.sub(r'[<>:"/\\|?*]', "_", name).strip() or "Unnamed"
+
+
+def partition_sheets(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Sheet name → rows, built from a single group‑by pass over *df*.
+
+    The "Activity Report" sheet is the full frame; every manager gets its
+    group slice.  Colliding sanitised names get a numeric suffix.
+    """
+    sheets: dict[str, pd.DataFrame] = {"Activity Report": df}
+    if "Manager Description" in df.columns:
+        for mgr, grp in df.groupby("Manager Description", sort=True, dropna=False):
+            base = name = manager_sheet_name(mgr)
+            n = 1
+            while name in sheets:
+                name = f"{base[:27]}_{n}"
+                n += 1
+            sheets[name] = grp
+    return sheets
+
+
+def _write_workbook(job: tuple[Path, dict[str, pd.DataFrame]]) -> Path:
+    """Write + style one workbook.  Top‑level so a process pool can pickle it."""
+    out_path, sheets = job
+    with pd.ExcelWriter(out_path, engine="openpyxl") as xl:
+        for name, data in sheets.items():
+            data.to_excel(xl, sheet_name=name, index=False)
+        style_workbook(xl, sheets)
+    return out_path
+
+
+def frame_digest(data: pd.DataFrame) -> str:
+    """Content hash of a sheet's frame (column names + row values, not the index)."""
+    h = hashlib.sha256(json.dumps([str(c) for c in data.columns]).encode())
+    h.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def write_excel(df: pd.DataFrame, out_path: Path) -> dict[str, str]:
+    """Write the full workbook; returns the per‑sheet content hashes."""
     print("Writing:", out_path)
+    sheets = partition_sheets(df)
+    _write_workbook((out_path, sheets))
+    print("✅ Excel saved.")
+    return {name: frame_digest(data) for name, data in sheets.items()}
+
+
+def _cell_value(v):
+    if pd.isna(v):
+        return None
+    return v.item() if hasattr(v, "item") else v
+
+
+def replace_sheet(wb, name: str, data: pd.DataFrame, index: Optional[int] = None):
+    """Drop *name* (if present) and rewrite it in place from *data*; a new
+    sheet goes to *index* (default: last)."""
+    if name in wb.sheetnames:
+        idx = wb.sheetnames.index(name)
+        wb.remove(wb[name])
+    else:
+        idx = len(wb.sheetnames) if index is None else index
+    ws = wb.create_sheet(name, idx)
+    ws.append([str(c) for c in data.columns])
+    for row in data.itertuples(index=False, name=None):
+        ws.append([_cell_value(v) for v in row])
+    style_sheet(ws, data.reset_index(drop=True))
+
+
+def _same_row_layout(ws, data: pd.DataFrame, keys: list[str]) -> bool:
+    """True if *ws* has the same header, row count and *keys* column values as *data*."""
+    if ws.max_row != len(data) + 1:
+        return False
+    if [c.value for c in ws[1]] != [str(c) for c in data.columns]:
+        return False
+    for key in keys:
+        col = data.columns.get_loc(key) + 1
+        current = [r[0] for r in ws.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True)]
+        if current != [_cell_value(v) for v in data[key]]:
+            return False
+    return True
+
+
+def update_excel(df: pd.DataFrame, out_path: Path, record: dict) -> dict[str, str]:
+    """Rewrite only the sheets whose content hash differs from the last run.
+
+    *record* is the previous run's sidecar.  Changed manager tabs – and any
+    missing from the workbook – are replaced, vanished ones removed.  On the
+    "Activity Report" sheet only those managers' rows are overwritten – as
+    long as the Project row order is unchanged; otherwise that one sheet is
+    rebuilt.  Falls back to a full write when there is no previous hash
+    record, or the workbook on disk is not the one that run wrote.
+    """
+    df = df.reset_index(drop=True)
+    sheets = partition_sheets(df)
+    hashes = {name: frame_digest(data) for name, data in sheets.items()}
+    previous = record.get("sheets", {})
+    if not previous or not output_untouched(out_path, record):
+        reason = f"{out_path.name} changed since the last run" if previous else "no previous sheet hashes"
+        print(f"Writing the full workbook ({reason}).")
+        _write_workbook((out_path, sheets))
+        print("✅ Excel saved.")
+        return hashes
+
+    wb = load_workbook(out_path)
+    changed = [n for n in sheets if n != "Activity Report"
+               and (previous.get(n) != hashes[n] or n not in wb.sheetnames)]
+    removed = [n for n in previous if n not in sheets]
+    report_changed = (previous.get("Activity Report") != hashes["Activity Report"]
+                      or "Activity Report" not in wb.sheetnames)
+    if not changed and not removed and not report_changed:
+        print("No sheet content changed – workbook left as is.")
+        return hashes
+
+    print(f"Updating: {out_path} ({len(changed)} changed, {len(removed)} removed manager tabs)")
+    for name in removed:
+        if name in wb.sheetnames:
+            wb.remove(wb[name])
+    order = list(sheets)
+    for name in changed:
+        # a tab deleted by hand goes back after the sheets that precede it
+        replace_sheet(wb, name, sheets[name],
+                      sum(n in wb.sheetnames for n in order[:order.index(name)]))
+        print("  ✎", name)
+
+    main_df = sheets["Activity Report"]
+    if report_changed:
+        # rows of one project always belong to one manager, so an unchanged
+        # Project sequence means every changed row sits in a changed manager's slice
+        if ("Activity Report" in wb.sheetnames
+                and {"Project", "Manager Description"}.issubset(main_df.columns)
+                and _same_row_layout(wb["Activity Report"], main_df, ["Project"])):
+            ws = wb["Activity Report"]
+            rows = sorted(i for n in changed for i in sheets[n].index)
+            for i in rows:
+                for c, v in enumerate(main_df.iloc[i], 1):
+                    ws.cell(row=i + 2, column=c, value=_cell_value(v))
+            print(f"  ✎ Activity Report ({len(rows)} rows)")
+        else:
+            replace_sheet(wb, "Activity Report", main_df, 0)
+            print("  ✎ Activity Report (rebuilt – row order changed or sheet missing)")
+    wb.save(out_path)
+    print("✅ Excel updated.")
+    return hashes
+
+
+def write_excel_per_manager(df: pd.DataFrame, out_path: Path, workers: Optional[int] = None):
+    """Fan out to one workbook per manager plus a master, in parallel.
+
+    The master (*out_path*) holds only the "Activity Report" sheet; each
+    manager gets ``<stem>_managers/<sheet name>.xlsx``.  Every file is
+    written and styled by its own worker process, so wall time scales with
+    cores instead of queueing behind a single openpyxl workbook.
+    """
+    sheets = partition_sheets(df)
+    mgr_dir = out_path.with_name(f"{out_path.stem}_managers")
+    mgr_dir.mkdir(exist_ok=True)
+
+    jobs = [(out_path, {"Activity Report": sheets.pop("Activity Report")})]
+    for name, data in sheets.items():
+        jobs.append((mgr_dir / f"{file_stem(name)}.xlsx", {name: data}))
+
+    print(f"Writing {len(jobs)} workbooks ({out_path.name} + {mgr_dir.name}/) …")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path in pool.map(_write_workbook, jobs):
+            print("  ✔", path.name)
+    # managers that disappeared since the last run (Excel's ~$ lock files stay)
+    keep = {path for path, _ in jobs}
+    for stale in mgr_dir.glob("*.xlsx"):
+        if stale not in keep and not stale.name.startswith("~$"):
+            stale.unlink()
+    print("✅ Excel saved.")
+
+
+def write_excel_table(df: pd.DataFrame, out_path: Path, manager_index: bool = True):
+    """Write the report *once* as an Excel Table (autofilter) – no manager tabs.
+
+    Rows are grouped by manager so each manager's block is contiguous; the
+    optional "Managers" index sheet lists every manager with totals and a
+    link that jumps to the first row of their block.
+    """
+    print("Writing (table layout):", out_path)
+    if "Manager Description" in df.columns:
+        df = df.sort_values("Manager Description", kind="stable", na_position="last").reset_index(drop=True)
+    sheets = {"Activity Report": df}
+    if manager_index and "Manager Description" in df.columns:
+        sheets["Managers"] = manager_index_frame(df)
     with pd.ExcelWriter(out_path, engine="openpyxl") as xl:
-        df.to_excel(xl, sheet_name="Activity Report", index=False)
-        if "Manager Description" in df.columns:
-            for mgr, grp in df.groupby("Manager Description"):
-                name = (
-                    "Unknown Manager"
-                    if pd.isna(mgr) or mgr == "Unknown Manager"
-                    else str(mgr)[:30].translate(str.maketrans("/\\?*[]:", "________"))
-                )
-                grp.to_excel(xl, sheet_name=name, index=False)
-        style_workbook(xl)
+        for name, data in sheets.items():
+            data.to_excel(xl, sheet_name=name, index=False)
+        style_workbook(xl, sheets)
+        for name, data in sheets.items():
+            add_table(xl.sheets[name], data, name.replace(" ", ""))
     print("✅ Excel saved.")
 
 
-def style_workbook(writer: pd.ExcelWriter):
-    wb = writer.book
-
-    def style(ws, data: pd.DataFrame):
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-        # column widths
-        for col_idx, col_name in enumerate(data.columns, 1):
-            max_len = max(data[col_name].astype(str).map(len).max(), len(col_name)) + 2
-            ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = max_len
-        money_cols = {"Estimated Cost", "Estimated Revenue", "Actual Cost", "Budget Remaining"}
-        for row in ws.iter_rows(min_row=2, max_row=len(data) + 1):
-            for cell in row:
-                if data.columns[cell.column - 1] in money_cols:
-                    cell.number_format = "$#,##0.00"
-        # green data‑bar per project group on Budget Remaining
-        if {"Project", "Budget Remaining"}.issubset(data.columns):
-            br_idx = data.columns.get_loc("Budget Remaining") + 1
-            pr_idx = data.columns.get_loc("Project") + 1
-            current, start = None, 2
-            for r in range(2, len(data) + 2):
-                proj = ws.cell(row=r, column=pr_idx).value
-                if current is None:
-                    current = proj
-                elif proj != current:
-                    _add_bar(ws, br_idx, start, r - 1)
-                    current, start = proj, r
-            _add_bar(ws, br_idx, start, len(data) + 1)
-
-    def _add_bar(ws, col_idx: int, r0: int, r1: int):
-        bar = DataBar(cfvo=[FormatObject(type="min"), FormatObject(type="max")], color="00B050", showValue=True)
-        rule = Rule(type="dataBar", dataBar=bar)
-        col = ws.cell(row=1, column=col_idx).column_letter
-        ws.conditional_formatting.add(f"{col}{r0}:{col}{r1}", rule)
-
-    for sheet_name, ws in writer.sheets.items():
-        # pandas passes values generator, so rebuild DataFrame for dimensions
-        data = pd.DataFrame(ws.values)
-        data.columns = data.iloc[0]
-        data = data[1:].reset_index(drop=True)
-        style(ws, data)
+def manager_index_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per manager block of *df* (must be sorted by manager)."""
+    money = [c for c in ("Estimated Cost", "Actual Cost", "Budget Remaining") if c in df.columns]
+    rows, first = [], 2  # row 1 is the header
+    for mgr, grp in df.groupby("Manager Description", sort=False, dropna=False):
+        rows.append({
+            "Manager Description": mgr,
+            "Activities": len(grp),
+            **{c: grp[c].sum() for c in money},
+            "Go to": f'=HYPERLINK("#\'Activity Report\'!A{first}", "Rows {first}–{first + len(grp) - 1}")',
+        })
+        first += len(grp)
+    return pd.DataFrame(rows)
+
+
+def add_table(ws, data: pd.DataFrame, name: str):
+    """Turn the written range into a styled Excel Table with autofilter."""
+    ref = f"A1:{get_column_letter(data.shape[1])}{len(data) + 1}"
+    table = Table(displayName=name, ref=ref)
+    table.tableStyleInfo = TableStyleInfo(name="TableStyleMedium2", showRowStripes=True)
+    ws.add_table(table)
+    ws.freeze_panes = "A2"
+
+
+def style_sheet(ws, data: pd.DataFrame):
+    """Header colours, column widths, money formats and per‑project data bars."""
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+    for cell in ws[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+    # column widths
+    for col_idx, col_name in enumerate(data.columns, 1):
+        max_len = max(data[col_name].astype(str).map(len).max(), len(col_name)) + 2
+        ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = max_len
+    money_cols = {"Estimated Cost", "Estimated Revenue", "Actual Cost", "Budget Remaining"}
+    for row in ws.iter_rows(min_row=2, max_row=len(data) + 1):
+        for cell in row:
+            if data.columns[cell.column - 1] in money_cols:
+                cell.number_format = "$#,##0.00"
+    # green data‑bar per project group on Budget Remaining
+    if {"Project", "Budget Remaining"}.issubset(data.columns):
+        br_idx = data.columns.get_loc("Budget Remaining") + 1
+        pr_idx = data.columns.get_loc("Project") + 1
+        current, start = None, 2
+        for r in range(2, len(data) + 2):
+            proj = ws.cell(row=r, column=pr_idx).value
+            if current is None:
+                current = proj
+            elif proj != current:
+                _add_bar(ws, br_idx, start, r - 1)
+                current, start = proj, r
+        _add_bar(ws, br_idx, start, len(data) + 1)
+
+
+def _add_bar(ws, col_idx: int, r0: int, r1: int):
+    bar = DataBar(cfvo=[FormatObject(type="min"), FormatObject(type="max")], color="00B050", showValue=True)
+    rule = Rule(type="dataBar", dataBar=bar)
+    col = ws.cell(row=1, column=col_idx).column_letter
+    ws.conditional_formatting.add(f"{col}{r0}:{col}{r1}", rule)
+
+
+def style_workbook(writer: pd.ExcelWriter, sheets: dict[str, pd.DataFrame]):
+    # style from the frames that were written – no re‑reading of ws.values
+    for sheet_name, data in sheets.items():
+        style_sheet(writer.sheets[sheet_name], data.reset_index(drop=True))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Columnar sidecars (Parquet / Arrow IPC)
+# ──────────────────────────────────────────────────────────────────────────────
+
+COLUMNAR_EXT = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _write_frame(df: pl.DataFrame, path: Path, fmt: str):
+    """Write via a temp file + rename so readers never see a half‑written file."""
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        df.write_parquet(tmp)
+    else:
+        df.write_ipc(tmp)
+    os.replace(tmp, path)
+
+
+def write_columnar(final: pl.DataFrame, out_path: Path, fmt: str = "parquet"):
+    """Write the Activity Report and its manager partitions next to *out_path*.
+
+    * ``reportX.parquet`` (or ``.arrow``) – the full Activity Report
+    * ``reportX_managers/<manager>.parquet`` – one file per manager
+
+    Frames go straight from Polars to disk; nothing is read back from Excel.
+    """
+    ext = COLUMNAR_EXT[fmt]
+    _write_frame(final, out_path.with_suffix(ext), fmt)
+    written = [out_path.with_suffix(ext).name]
+    if "Manager Description" in final.columns:
+        mgr_dir = out_path.with_name(f"{out_path.stem}_managers")
+        mgr_dir.mkdir(exist_ok=True)
+        keep: set[Path] = set()
+        for part in final.partition_by("Manager Description", maintain_order=True):
+            base = stem = file_stem(manager_sheet_name(part["Manager Description"][0]))
+            n = 1
+            while mgr_dir / f"{stem}{ext}" in keep:
+                stem = f"{base}_{n}"
+                n += 1
+            path = mgr_dir / f"{stem}{ext}"
+            _write_frame(part, path, fmt)
+            keep.add(path)
+        # managers that disappeared since the last run
+        for stale in mgr_dir.glob(f"*{ext}"):
+            if stale not in keep:
+                stale.unlink()
+        written.append(f"{mgr_dir.name}/ ({len(keep)} files)")
+    print(f"✅ Columnar sidecars ({fmt}):", ", ".join(written))
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--folder", default=r"C:/Reporting/Data Downloaded from IFS", help="Root folder containing IFS downloads")
+    layout = ap.add_mutually_exclusive_group()
+    layout.add_argument("--per-manager", action="store_true", help="Write one workbook per manager plus the master, in parallel")
+    layout.add_argument("--table", action="store_true", help="Write the data once as an Excel Table with autofilter (no manager tabs)")
+    layout.add_argument("--update", action="store_true", help="Rewrite only manager tabs (and Activity Report rows) whose data changed")
+    ap.add_argument("--workers", type=int, default=None, help="Process pool size for --per-manager (default: CPU count)")
+    ap.add_argument("--no-manager-index", action="store_true", help="With --table, skip the 'Managers' index sheet")
+    ap.add_argument("--force", action="store_true", help="Rebuild even if inputs and options are unchanged")
+    ap.add_argument("--columnar", choices=["parquet", "arrow", "none"], default="parquet",
+                    help="Also write the report + manager partitions as Parquet / Arrow IPC (default: parquet)")
     args = ap.parse_args()
-    main(args.folder)
+    main(args.folder, per_manager=args.per_manager, workers=args.workers,
+         table=args.table, manager_index=not args.no_manager_index, force=args.force,
+         update=args.update, columnar=args.columnar)
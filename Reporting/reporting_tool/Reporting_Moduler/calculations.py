@@ -18,12 +18,105 @@ from data_pull import pull_data, find_column_match
 import pandas as pd # Moved pandas import after the fix for consistency
 from openpyxl.styles import Font, PatternFill
 from openpyxl.formatting.rule import DataBar, FormatObject, Rule
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableStyleInfo
 
 
 # Define the folder path for the output report
 output_folder_path = r"C:\Reporting\Data Downloaded from IFS"
 
-def perform_calculations():
+def build_manager_index(final_report):
+    """One row per manager block of final_report (rows must already be grouped by manager),
+    with totals and a link to the block's first row on the 'Activity Report' sheet."""
+    money_cols = [c for c in ['Estimated Cost', 'Actual Cost', 'Budget Remaining'] if c in final_report.columns]
+    index_rows = []
+    first_row = 2 # Row 1 is the header
+    for manager, manager_data in final_report.groupby('Manager Description', sort=False, dropna=False):
+        last_row = first_row + len(manager_data) - 1
+        row = {'Manager Description': manager, 'Activities': len(manager_data)}
+        for col in money_cols:
+            row[col] = manager_data[col].sum()
+        row['Go to'] = f'=HYPERLINK("#\'Activity Report\'!A{first_row}", "Rows {first_row}-{last_row}")'
+        index_rows.append(row)
+        first_row = last_row + 1
+    return pd.DataFrame(index_rows)
+
+def add_excel_table(worksheet, data_df, table_name):
+    """Turn the written range of worksheet into an Excel Table (with autofilter)."""
+    if worksheet is None or data_df.empty:
+        return
+    ref = f"A1:{get_column_letter(len(data_df.columns))}{len(data_df) + 1}"
+    table = Table(displayName=table_name, ref=ref)
+    table.tableStyleInfo = TableStyleInfo(name='TableStyleMedium2', showRowStripes=True)
+    worksheet.add_table(table)
+    worksheet.freeze_panes = 'A2'
+
+def _write_columnar_frame(data_df, path, fmt):
+    """Write one DataFrame as Parquet or Arrow IPC (Feather v2) via a temp file + rename."""
+    data_df = data_df.reset_index(drop=True)
+    tmp_path = path + '.tmp'
+    try:
+        try:
+            _to_columnar(data_df, tmp_path, fmt)
+        except (TypeError, ValueError) as e:
+            # Excel exports often mix numbers and text in one object column; store those as text
+            print(f"Retrying {os.path.basename(path)} with mixed-type columns as text ({e}).")
+            data_df = data_df.copy()
+            for col in data_df.columns[data_df.dtypes == object]:
+                data_df[col] = data_df[col].map(lambda v: v if pd.isna(v) else str(v))
+            _to_columnar(data_df, tmp_path, fmt)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing columnar file {path}: {e}")
+
+def _to_columnar(data_df, path, fmt):
+    if fmt == 'parquet':
+        data_df.to_parquet(path, index=False)
+    else:
+        data_df.to_feather(path)
+
+def write_columnar_sidecars(final_report, employee_hours, output_file, fmt='parquet'):
+    """Write the Activity Report, one file per manager and Employee Hours next to output_file.
+
+    For output_file=reportX.xlsx and fmt='parquet' this produces reportX.parquet,
+    reportX_managers/<manager>.parquet and reportX_employee_hours.parquet
+    (fmt='arrow' writes the same files as Arrow IPC with an .arrow extension).
+    """
+    ext = '.parquet' if fmt == 'parquet' else '.arrow'
+    base = os.path.splitext(output_file)[0]
+    if not final_report.empty:
+        _write_columnar_frame(final_report, base + ext, fmt)
+        print(f"Written columnar Activity Report: {base + ext}")
+        if 'Manager Description' in final_report.columns:
+            managers_dir = base + '_managers'
+            os.makedirs(managers_dir, exist_ok=True)
+            written = set()
+            for manager, manager_data in final_report.groupby('Manager Description', sort=False, dropna=False):
+                stem = re.sub(r'[<>:"/\\|?*\[\]]', '_', str(manager) if pd.notna(manager) else 'Unknown Manager').strip() or 'UnnamedMgr'
+                file_name = stem + ext
+                counter = 1
+                while file_name in written:
+                    file_name = f"{stem}_{counter}{ext}"
+                    counter += 1
+                written.add(file_name)
+                _write_columnar_frame(manager_data, os.path.join(managers_dir, file_name), fmt)
+            for existing in os.listdir(managers_dir): # Remove managers that no longer exist
+                if existing.endswith(ext) and existing not in written:
+                    os.remove(os.path.join(managers_dir, existing))
+            print(f"Written {len(written)} columnar manager partitions to {managers_dir}")
+    if not employee_hours.empty:
+        _write_columnar_frame(employee_hours, base + '_employee_hours' + ext, fmt)
+        print(f"Written columnar Employee Hours: {base + '_employee_hours' + ext}")
+
+def perform_calculations(layout='sheets', columnar='parquet'):
+    """Build reportX.xlsx.
+
+    layout='sheets' writes the Activity Report plus one tab per manager (the default).
+    layout='table' writes the rows once, as an Excel Table with autofilter, plus a
+    'Managers' index sheet linking to each manager's block of rows.
+    columnar='parquet' / 'arrow' also writes the same frames as columnar sidecar
+    files (see write_columnar_sidecars); columnar='none' skips them.
+    """
     print("--- Starting perform_calculations() ---")
     ae_data, pt_data, p_data, project_manager_mapping = pull_data()
 
@@ -208,21 +301,32 @@ def perform_calculations():
                  final_report.sort_values('Activity Seq', inplace=True, na_position='last')
                  print("Sorted final report by 'Activity Seq'.")
 
+            if layout == 'table' and 'Manager Description' in final_report.columns:
+                # Stable sort keeps the Project ordering inside each manager's block
+                final_report = final_report.sort_values('Manager Description', kind='stable', na_position='last')
+                print("Grouped final report rows by 'Manager Description' for the table layout.")
+
         with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
             if not final_report.empty:
                 final_report.to_excel(writer, sheet_name='Activity Report', index=False)
                 print(f"Written 'Activity Report' sheet with {len(final_report)} rows.")
 
             used_sheet_names = {'Activity Report', 'Employee Hours'}
-            managers_for_tabs = []
-            if not final_report.empty and 'Manager Description' in final_report.columns:
-                managers_for_tabs = [m for m in final_report['Manager Description'].unique() if pd.notna(m) and str(m).strip() not in ['', 'Unknown Manager']]
-
-                if not managers_for_tabs:
+            # One partition pass over the report: sheet name -> (manager, rows).
+            # The formatting pass below reuses these slices instead of re-filtering.
+            manager_sheets = {}
+            if layout == 'sheets' and not final_report.empty and 'Manager Description' in final_report.columns:
+                manager_groups = [
+                    (manager, manager_data)
+                    for manager, manager_data in final_report.groupby('Manager Description', sort=False)
+                    if pd.notna(manager) and str(manager).strip() not in ['', 'Unknown Manager']
+                ]
+
+                if not manager_groups:
                     print("No valid manager descriptions for separate tabs.")
                 else:
-                    print(f"Preparing to create separate tabs for {len(managers_for_tabs)} managers.")
-                    for manager in managers_for_tabs:
+                    print(f"Preparing to create separate tabs for {len(manager_groups)} managers.")
+                    for manager, manager_data in manager_groups:
                         manager_str = str(manager)
                         base_name = re.sub(r'[\\/*?:\[\]]', '_', manager_str)[:28].strip()
                         if not base_name: base_name = "UnnamedMgr"
@@ -234,13 +338,10 @@ def perform_calculations():
                             counter += 1
                         used_sheet_names.add(sheet_name)
 
-                        manager_data = final_report[final_report['Manager Description'] == manager_str]
-                        if not manager_data.empty:
-                            manager_data.to_excel(writer, sheet_name=sheet_name, index=False)
-                            project_list = manager_data['Project'].unique().tolist() if 'Project' in manager_data else []
-                            print(f"  - Created tab '{sheet_name}' for manager '{manager_str}' with {len(manager_data)} records. Projects: {project_list[:3]}...")
-                        else:
-                             print(f"  - Skipped tab for manager '{manager_str}' (no data after filtering).")
+                        manager_data.to_excel(writer, sheet_name=sheet_name, index=False)
+                        manager_sheets[sheet_name] = (manager_str, manager_data)
+                        project_list = manager_data['Project'].unique().tolist() if 'Project' in manager_data else []
+                        print(f"  - Created tab '{sheet_name}' for manager '{manager_str}' with {len(manager_data)} records. Projects: {project_list[:3]}...")
 
             if not employee_hours.empty:
                 employee_hours.to_excel(writer, sheet_name='Employee Hours', index=False)
@@ -304,37 +405,35 @@ def perform_calculations():
                 apply_formatting_to_worksheet(workbook['Employee Hours'], employee_hours, apply_databar=False)
                 print("Applied formatting to 'Employee Hours'.")
 
-            if managers_for_tabs: # Check if we intended to create manager tabs
-                for sheet_name_in_wb in workbook.sheetnames:
-                    if sheet_name_in_wb not in ['Activity Report', 'Employee Hours']: # This must be a manager sheet
-                        # Find original manager name for this sheet to filter data correctly for formatting
-                        original_manager_name_for_sheet = None
-                        for manager_candidate in managers_for_tabs:
-                            sanitized_candidate_base = re.sub(r'[\\/*?:\[\]]', '_', str(manager_candidate))[:28].strip()
-                            if not sanitized_candidate_base: sanitized_candidate_base = "UnnamedMgr"
-                            
-                            # Check if sheet_name_in_wb matches base or base_counter
-                            if sheet_name_in_wb == sanitized_candidate_base:
-                                original_manager_name_for_sheet = manager_candidate
-                                break
-                            # Check for suffixed names (e.g., UnnamedMgr_1)
-                            if "_" in sheet_name_in_wb:
-                                prefix_sheet_name = sheet_name_in_wb.rsplit('_',1)[0]
-                                if prefix_sheet_name == sanitized_candidate_base[:26]: # Match against potentially trimmed prefix
-                                     original_manager_name_for_sheet = manager_candidate
-                                     break
-
-
-                        if original_manager_name_for_sheet:
-                            manager_data_for_sheet = final_report[final_report['Manager Description'] == original_manager_name_for_sheet]
-                            if not manager_data_for_sheet.empty:
-                                apply_formatting_to_worksheet(workbook[sheet_name_in_wb], manager_data_for_sheet, apply_databar=True)
-                                print(f"Applied formatting to manager sheet '{sheet_name_in_wb}'.")
-                        else:
-                             print(f"Could not reliably match sheet '{sheet_name_in_wb}' back to an original manager for formatting data.")
+            for sheet_name, (manager_str, manager_data) in manager_sheets.items():
+                apply_formatting_to_worksheet(workbook[sheet_name], manager_data, apply_databar=True)
+                print(f"Applied formatting to manager sheet '{sheet_name}' ({manager_str}).")
+
+            if layout == 'table':
+                if not final_report.empty and 'Activity Report' in workbook.sheetnames:
+                    add_excel_table(workbook['Activity Report'], final_report, 'ActivityReport')
+                    if 'Manager Description' in final_report.columns:
+                        manager_index = build_manager_index(final_report)
+                        manager_index.to_excel(writer, sheet_name='Managers', index=False)
+                        apply_formatting_to_worksheet(workbook['Managers'], manager_index, apply_databar=False)
+                        add_excel_table(workbook['Managers'], manager_index, 'Managers')
+                        print(f"Written 'Managers' index sheet for {len(manager_index)} managers.")
+                if not employee_hours.empty and 'Employee Hours' in workbook.sheetnames:
+                    add_excel_table(workbook['Employee Hours'], employee_hours, 'EmployeeHours')
+                print("Applied Excel Table layout.")
         print(f"Report successfully created: {output_file}")
+
+        if columnar != 'none':
+            write_columnar_sidecars(final_report, employee_hours, output_file, columnar)
     else:
         print("No data (neither final_report nor employee_hours) was available to write to the Excel report.")
 
 if __name__ == "__main__":
-    perform_calculations()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--layout', choices=['sheets', 'table'], default='sheets',
+                        help="'sheets' = one tab per manager, 'table' = single Excel Table plus 'Managers' index")
+    parser.add_argument('--columnar', choices=['parquet', 'arrow', 'none'], default='parquet',
+                        help="Also write the report frames as Parquet / Arrow IPC sidecar files")
+    args = parser.parse_args()
+    perform_calculations(layout=args.layout, columnar=args.columnar)
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""
+Load-test the Streamlit explorer (`report_streamlit.py`) with many sessions.
+
+A synthetic IFS dataset of the requested size is written to a temporary
+folder – `reportX.parquet` shaped like the ProjectX_4_Polars output plus a
+matching `PT_export.csv` – and the explorer is pointed at it through
+`IFS_REPORT_PATH`.  N headless sessions (Streamlit's `AppTest`) then replay
+realistic manager interactions: pick managers / projects, narrow the budget
+slider, sort, page and search the table, change the chart's top-N, drill
+into an activity, slice Employee Hours, prepare an export.
+
+All sessions live in this one process and share its caches exactly as
+sessions of one server do.  `AppTest` executes one rerun at a time, so the
+sessions are interleaved round-robin: the latencies reported are per
+interaction service times with N sessions alive, not queueing delay under
+simultaneous clicks (with P simultaneous clicks, expect up to ~P × these).
+
+Usage
+-----
+    python loadtest_explorer.py --sessions 20 --steps 15 --rows 10000,200000
+    python loadtest_explorer.py --engine DuckDB --rows 500000
+
+Each dataset size runs in a fresh subprocess, so caches and memory of one
+size never leak into the next.  Reported per size: latency percentiles
+(overall and per interaction), errors, and resident memory per session.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP = Path(__file__).with_name("report_streamlit.py")
+MANAGERS = ["Alice Smith", "Bob Jones", "Carol White", "Dan Brown",
+            "Eve Black", "Frank Green", "Grace Hall", "Unknown Manager"]
+REPORT_CODES = ["Labour", "Overtime", "Travel", "Material", "Subcontract", "Expenses"]
+SEARCH_TERMS = ["act", "prj0", "install", "review", "zz-no-match"]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Synthetic data
+# ──────────────────────────────────────────────────────────────────────────────
+
+def synthetic_dataset(folder: Path, rows: int, seed: int = 0) -> pd.DataFrame:
+    """Write reportX.parquet + PT_export.csv with *rows* activities; return the report."""
+    rng = np.random.default_rng(seed)
+    n_projects = max(10, rows // 50)
+    projects = np.array([f"PRJ{i:05d}" for i in range(n_projects)])
+    project = projects[rng.integers(0, n_projects, rows)]
+    manager_of = dict(zip(projects, rng.choice(MANAGERS, n_projects)))
+    seq = np.arange(100_000, 100_000 + rows)
+    est_cost = rng.gamma(2.0, 2_500.0, rows).round(2)
+    actual = (est_cost * rng.uniform(0.0, 1.4, rows)).round(2)
+    report = pd.DataFrame({
+        "Activity Seq": seq,
+        "Project": project,
+        "Project Description": [f"Project {p[3:]} install" for p in project],
+        "Activity": [f"A{s}" for s in seq],
+        "Activity Description": rng.choice(["act design", "act install", "act review", "act test"], rows),
+        "Estimated Revenue": (est_cost * rng.uniform(1.0, 1.5, rows)).round(2),
+        "Estimated Cost": est_cost,
+        "Actual Cost": actual,
+        "Budget Remaining": (est_cost - actual).round(2),
+        "Manager Description": [manager_of[p] for p in project],
+    }).sort_values(["Project", "Budget Remaining"], ignore_index=True)
+    report.to_parquet(folder / "reportX.parquet", index=False)
+
+    n_pt = rows * 5
+    pt_seq = rng.choice(seq, n_pt)
+    pd.DataFrame({
+        "Activity Seq": pt_seq,
+        "Project Activity Sequence": pt_seq,
+        "Total Internal Price": rng.gamma(2.0, 120.0, n_pt).round(2),
+        "Internal Quantity": rng.uniform(0.5, 8.0, n_pt).round(1),
+        "Report Code Description": rng.choice(REPORT_CODES, n_pt),
+        "Employee Description": [f"Emp {i}" for i in rng.integers(0, 150, n_pt)],
+    }).to_csv(folder / "PT_export.csv", index=False)
+    return report
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Simulated session
+# ──────────────────────────────────────────────────────────────────────────────
+
+def widget(elements, label: str):
+    return next(w for w in elements if w.label == label)
+
+
+class Session:
+    """One simulated manager: an AppTest plus a seeded choice of next steps."""
+
+    def __init__(self, report: pd.DataFrame, engine: str, seed: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.report = report
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(str(APP), default_timeout=timeout)
+        self.engine = engine
+        self.page = 1
+
+    def open(self):
+        self.at.run()
+        if self.engine != "pandas":
+            self.at.radio(key="engine").set_value(self.engine).run()
+
+    # each action changes one widget and reruns, like one click
+    def filter_manager(self):
+        pick = self.rng.sample(MANAGERS, self.rng.randint(1, 2))
+        widget(self.at.multiselect, "Manager Description").set_value(pick).run()
+
+    def filter_project(self):
+        projects = self.report["Project"].unique().tolist()
+        pick = self.rng.sample(projects, min(len(projects), self.rng.randint(1, 3)))
+        widget(self.at.multiselect, "Project").set_value(pick).run()
+
+    def budget_slider(self):
+        lo, hi = self.report["Budget Remaining"].min(), self.report["Budget Remaining"].max()
+        a, b = sorted(self.rng.uniform(lo, hi) for _ in range(2))
+        widget(self.at.slider, "Budget Remaining").set_value((float(a), float(b))).run()
+
+    def clear_filters(self):
+        for label in ("Manager Description", "Project"):
+            widget(self.at.multiselect, label).set_value([])
+        lo, hi = self.report["Budget Remaining"].min(), self.report["Budget Remaining"].max()
+        widget(self.at.slider, "Budget Remaining").set_value((float(lo), float(hi))).run()
+
+    def sort_table(self):
+        self.at.selectbox(key="table_sort").set_value(
+            self.rng.choice(["Project", "Budget Remaining", "Actual Cost", "Activity Seq"]))
+        self.at.radio(key="table_dir").set_value(self.rng.choice(["↑", "↓"])).run()
+
+    def next_page(self):
+        self.page += 1
+        page = self.at.number_input(key="table_page")
+        page.set_value(min(self.page, page.max)).run()
+
+    def search(self):
+        self.at.text_input(key="table_search").set_value(self.rng.choice(SEARCH_TERMS)).run()
+
+    def chart_top_n(self):
+        self.at.slider(key="chart_top_n").set_value(self.rng.choice([5, 10, 30, 50, 100])).run()
+
+    def drill_down(self):
+        # only what the (filtered) drill-down offers; options are display labels
+        projects = self.at.selectbox(key="drill_project").options
+        if not projects:
+            return
+        self.at.selectbox(key="drill_project").set_value(self.rng.choice(projects)).run()
+        activities = self.at.selectbox(key="drill_activity").options
+        if activities:
+            seq = int(self.rng.choice(activities).split(" · ")[0])
+            self.at.selectbox(key="drill_activity").set_value(seq).run()
+
+    def hours_slice(self):
+        self.at.selectbox(key="hours_rows").set_value(
+            self.rng.choice(["Employee Description", "Project", "Report Code Description"])).run()
+
+    def prepare_export(self):
+        self.at.radio(key="export_fmt").set_value(self.rng.choice(["CSV", "Parquet"]))
+        self.at.button(key="export_prepare").click().run()
+
+    ACTIONS = {                       # action → relative frequency
+        "filter_manager": 4, "filter_project": 3, "budget_slider": 2, "clear_filters": 1,
+        "sort_table": 2, "next_page": 3, "search": 2, "chart_top_n": 2,
+        "drill_down": 2, "hours_slice": 1, "prepare_export": 1,
+    }
+
+    def next_action(self) -> str:
+        names = list(self.ACTIONS)
+        return self.rng.choices(names, weights=[self.ACTIONS[n] for n in names])[0]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Measurement
+# ──────────────────────────────────────────────────────────────────────────────
+
+def rss_bytes() -> tuple[int, str]:
+    """(bytes, label) – current RSS via psutil, else the peak from getrusage."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss, "RSS"
+    except ImportError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak * (1 if sys.platform == "darwin" else 1024), "peak RSS"
+
+
+def percentiles(ms: list[float]) -> dict[str, float]:
+    p = np.percentile(ms, [50, 90, 95, 99]) if ms else [np.nan] * 4
+    return {"n": len(ms), "p50": p[0], "p90": p[1], "p95": p[2], "p99": p[3],
+            "max": max(ms) if ms else np.nan}
+
+
+def run_size(rows: int, sessions: int, steps: int, engine: str, seed: int, timeout: float):
+    with tempfile.TemporaryDirectory(prefix="explorer_load_") as tmp:
+        folder = Path(tmp)
+        print(f"\n▶ {rows:,} activities · {sessions} sessions × {steps} steps · engine {engine}")
+        report = synthetic_dataset(folder, rows, seed)
+        os.environ["IFS_REPORT_PATH"] = str(folder / "reportX.xlsx")   # only the .parquet exists
+        rss0, rss_label = rss_bytes()
+
+        latencies: dict[str, list[float]] = defaultdict(list)
+        errors: dict[str, int] = defaultdict(int)
+        first_error: dict[str, str] = {}
+        users: list[Session] = []
+        t_start = time.perf_counter()
+        for i in range(sessions):     # first load: the cold load, then warm ones
+            user = Session(report, engine, seed * 1000 + i, timeout)
+            t0 = time.perf_counter()
+            user.open()
+            latencies["cold open" if i == 0 else "open"].append((time.perf_counter() - t0) * 1000)
+            users.append(user)
+        rss_open, _ = rss_bytes()
+
+        for _ in range(steps):        # round-robin: every live session clicks once per round
+            for user in users:
+                action = user.next_action()
+                t0 = time.perf_counter()
+                try:
+                    getattr(user, action)()
+                    failure = user.at.exception[0].value if len(user.at.exception) else None
+                except Exception as exc:   # widget missing / AppTest error – count, keep going
+                    failure = f"{type(exc).__name__}: {exc}"
+                latencies[action].append((time.perf_counter() - t0) * 1000)
+                if failure:
+                    errors[action] += 1
+                    first_error.setdefault(action, failure)
+        elapsed = time.perf_counter() - t_start
+        rss1, _ = rss_bytes()
+
+    interactions = [ms for name, values in latencies.items() if "open" not in name for ms in values]
+    table = pd.DataFrame({name: percentiles(values) for name, values in
+                          sorted(latencies.items())} | {"ALL interactions": percentiles(interactions)}).T
+    table["errors"] = [errors.get(name, 0) for name in table.index[:-1]] + [sum(errors.values())]
+    with pd.option_context("display.float_format", "{:,.1f}".format, "display.width", 120):
+        print(table[["n", "p50", "p90", "p95", "p99", "max", "errors"]].to_string())
+    print(f"  throughput   : {len(interactions) / elapsed:,.1f} interactions/s "
+          f"({elapsed:,.1f} s total)")
+    print(f"  memory ({rss_label}): {rss0 / 2**20:,.0f} MiB before · "
+          f"{rss_open / 2**20:,.0f} MiB with {sessions} sessions open · "
+          f"{rss1 / 2**20:,.0f} MiB after the run")
+    print(f"  per session  : {(rss1 - rss0) / sessions / 2**20:,.2f} MiB "
+          "(shared report + caches included, amortized)")
+    for action, message in first_error.items():
+        print(f"  first error in {action}: {message.splitlines()[0][:200]}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--sessions", type=int, default=10, help="Simulated concurrent sessions (default: 10)")
+    ap.add_argument("--steps", type=int, default=10, help="Interactions per session (default: 10)")
+    ap.add_argument("--rows", default="10000", help="Activities in the synthetic report; comma list runs each size")
+    ap.add_argument("--engine", choices=["pandas", "DuckDB"], default="pandas", help="Explorer query engine")
+    ap.add_argument("--seed", type=int, default=0, help="Seed for data and click sequences")
+    ap.add_argument("--timeout", type=float, default=120, help="Per-rerun timeout in seconds")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.rows.split(",") if s.strip()]
+    if len(sizes) == 1:
+        run_size(sizes[0], args.sessions, args.steps, args.engine, args.seed, args.timeout)
+    else:
+        for size in sizes:            # fresh process per size: no shared caches / memory
+            subprocess.run([sys.executable, __file__, "--rows", str(size),
+                            "--sessions", str(args.sessions), "--steps", str(args.steps),
+                            "--engine", args.engine, "--seed", str(args.seed),
+                            "--timeout", str(args.timeout)], check=True)
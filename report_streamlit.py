@@ -1,13 +1,61 @@
 # app.py  – Streamlit explorer for the IFS Activity report
-# Default data file:
+# Default data file (environment variable IFS_REPORT_PATH overrides it):
 #   C:\Reporting\Data Downloaded from IFS\reportX.xlsx
+# If the report generator also wrote a columnar copy next to it
+# (reportX.arrow / reportX.parquet) that copy is read instead – no openpyxl
+# parsing.
+# The default report is held ONCE per server process as an immutable Arrow
+# table (st.cache_resource); every session gets the same Arrow-backed
+# DataFrame over it and keeps only its own filter row positions.
+# A background watcher polls that file (and the PT export beside it); a
+# regenerated file is loaded and indexed off the request path and only then
+# swapped in, so nobody waits on a cold load or keeps seeing yesterday's data.
+# With "Build live" on, the report is instead joined in process from the raw
+# AE / PT / P exports in that folder (ProjectX_4_Polars.build_report).
+# The drill-down reads the latest PT export from the same folder, indexed by
+# Activity Seq once per file version; the Employee Hours tab reads a cube
+# aggregated from calculations.py's Employee Hours (or that PT export).
+
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
 
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from io import BytesIO
 from pathlib import Path
 
-DEFAULT_PATH = Path(r"C:\Reporting\Data Downloaded from IFS\reportX.xlsx")
+try:                                  # optional: shared SQL query engine
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:                                  # optional: fast multi-threaded Excel reader
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:                                  # optional: in-process report generation
+    import ProjectX_4_Polars as projectx
+except ImportError:                   # (needs Polars + openpyxl)
+    projectx = None
+
+DEFAULT_PATH = Path(os.environ.get("IFS_REPORT_PATH",          # override: tests / other sites
+                                   r"C:\Reporting\Data Downloaded from IFS\reportX.xlsx"))
+WATCH_INTERVAL_S = 15          # how often the watcher re-stats the report
+AGG_CACHE_SIZE = 256           # aggregate results kept across all sessions
+RESULT_CACHE_SIZE = 32         # filtered row sets kept across all sessions
+UPLOAD_CACHE_SIZE = 4          # parsed uploads kept, keyed by content hash
+ACTIVITY_CACHE_SIZE = 32       # drill-down activity lists (one project each) kept
+TIMING_HISTORY = 50            # reruns kept by the timing panel
 
 st.set_page_config(page_title="IFS Activity Budget Explorer", layout="wide")
 st.title("📊 IFS Activity Budget / Actual Explorer")
@@ -15,23 +63,648 @@ st.title("📊 IFS Activity Budget / Actual Explorer")
 # ------------------------------------------------------------------
 # 1.  Load data
 # ------------------------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_default_file(path: Path) -> pd.DataFrame:
-    if path.exists():
-        st.sidebar.success(f"Loaded default file:\n{path}")
-        return pd.read_excel(path, engine="openpyxl")
-    st.sidebar.warning(f"Default file not found:\n{path}")
-    return pd.DataFrame()
-
-@st.cache_data(show_spinner=False)
+class LRUCache:
+    """Small thread-safe LRU held in a cache_resource, i.e. shared by every session.
+
+    ``hits`` / ``misses`` count for the whole process; ``thread_stats()`` only
+    for the calling thread, i.e. the current script run.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _tally(self, field: str):
+        setattr(self, field, getattr(self, field) + 1)
+        setattr(self._local, field, getattr(self._local, field, 0) + 1)
+
+    def thread_stats(self) -> tuple:
+        return getattr(self._local, "hits", 0), getattr(self._local, "misses", 0)
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._tally("hits")
+                return self._data[key]
+        value = compute()             # outside the lock: a duplicate miss is harmless
+        with self._lock:
+            self._tally("misses")
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+
+@st.cache_resource(show_spinner=False)
+def upload_cache() -> LRUCache:
+    """Parsed uploads by content hash."""
+    return LRUCache(UPLOAD_CACHE_SIZE)
+
+@st.cache_resource(show_spinner=False)
+def aggregate_cache() -> LRUCache:
+    """count / sums / per-project totals by (version, filter key, aggregate)."""
+    return LRUCache(AGG_CACHE_SIZE)
+
+@st.cache_resource(show_spinner=False)
+def result_cache() -> LRUCache:
+    """Filtered row positions per (dataset version, filter key) – row arrays
+    are big, so fewer of them are kept than aggregates."""
+    return LRUCache(RESULT_CACHE_SIZE)
+
+@st.cache_resource(show_spinner=False)
+def activity_cache() -> LRUCache:
+    """One project's filtered activity rows for the drill-down, by (version,
+    filter key, project) – row sets, so kept apart from the aggregates."""
+    return LRUCache(ACTIVITY_CACHE_SIZE)
+
+# The st.cache_data / st.cache_resource functions below count their calls the
+# same way: each is wrapped by ``tallied``, which counts the call outside the
+# cache and the miss inside the body – the body only runs on a miss.
+class CallTally:
+    """Calls / misses of one cached function on the calling thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def bump(self, field: str):
+        setattr(self._local, field, getattr(self._local, field, 0) + 1)
+
+    def thread_stats(self) -> tuple:
+        calls, misses = getattr(self._local, "calls", 0), getattr(self._local, "misses", 0)
+        return calls - misses, misses
+
+CACHE_TALLIES = {}
+
+def tallied(name: str, cache):
+    """Apply *cache* (a configured st.cache_* decorator), counting hits and
+    misses under *name* for the timing panel."""
+    tally = CACHE_TALLIES[name] = CallTally()
+
+    def wrap(func):
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            tally.bump("misses")
+            return func(*args, **kwargs)
+        cached = cache(body)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            tally.bump("calls")
+            return cached(*args, **kwargs)
+        call.clear = cached.clear
+        return call
+    return wrap
+
+# Opt-in timing ("⏱ Timing panel" in the sidebar): wall time per script
+# section and per display fragment, plus this run's hits / misses on the LRU
+# caches above and the tallied cached functions, kept as a rolling history in
+# the session.  Off, every mark() is a no-op.
+def cache_stats() -> dict:
+    stats = {name: cache().thread_stats() for name, cache in
+             (("uploads", upload_cache), ("aggregates", aggregate_cache),
+              ("results", result_cache), ("activities", activity_cache))}
+    stats.update((name, tally.thread_stats()) for name, tally in CACHE_TALLIES.items())
+    return stats
+
+class RerunTimer:
+    """Section timings of one script run (or of one fragment-only rerun)."""
+
+    def __init__(self, enabled: bool, kind: str = "full run"):
+        self.enabled, self.kind, self.done = enabled, kind, False
+        self.sections = {}
+        self._start = self._last = time.perf_counter()
+        self._caches = cache_stats() if enabled else {}
+
+    def mark(self, section: str):
+        """Charge the time since the previous mark to *section*."""
+        if self.enabled:
+            now = time.perf_counter()
+            self.sections[section] = self.sections.get(section, 0.0) + now - self._last
+            self._last = now
+
+    def add(self, section: str, seconds: float):
+        self.sections[section] = self.sections.get(section, 0.0) + seconds
+        self._last = time.perf_counter()
+
+    def finish(self) -> dict:
+        """Close the run and append it to the session's rolling history."""
+        self.done = True
+        record = {"kind": self.kind, "at": time.strftime("%H:%M:%S"),
+                  "total_ms": (time.perf_counter() - self._start) * 1000,
+                  "sections_ms": {k: v * 1000 for k, v in self.sections.items()},
+                  "cache": {name: (hits - self._caches.get(name, (0, 0))[0],
+                                   misses - self._caches.get(name, (0, 0))[1])
+                            for name, (hits, misses) in cache_stats().items()}}
+        st.session_state.setdefault("timing_history", deque(maxlen=TIMING_HISTORY)).append(record)
+        return record
+
+def timed(section: str):
+    """Time a display fragment: into the current run's timer during a full
+    run, or as its own history entry when the fragment reruns alone."""
+    def wrap(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            if not timer.enabled:
+                return func(*args, **kwargs)
+            own = RerunTimer(True, f"fragment: {section}") if timer.done else None
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                (own or timer).add(section, time.perf_counter() - t0)
+                if own:
+                    own.finish()
+        return run
+    return wrap
+
+timer = RerunTimer(st.session_state.get("timing_panel", False))
+
+def columnar_copy(path: Path):
+    """reportX.arrow / reportX.parquet next to *path*, if at least as new as it."""
+    for ext in (".arrow", ".parquet"):       # Arrow IPC first: mmap is zero-copy
+        candidate = path.with_suffix(ext)
+        if candidate.exists() and (not path.exists() or
+                                   candidate.stat().st_mtime >= path.stat().st_mtime):
+            return candidate
+    return None
+
+def read_columnar(path: Path) -> pa.Table:
+    if path.suffix == ".arrow":
+        # Read into memory rather than keeping a map open: the table lives for
+        # the whole process, and a mapped file can't be replaced on Windows.
+        with pa.OSFile(str(path), "rb") as source:
+            table = pa.ipc.open_file(source).read_all()
+    else:
+        table = pq.read_table(path, memory_map=True)
+    return plain_strings(table)
+
+def plain_strings(table: pa.Table) -> pa.Table:
+    # Polars writes string_view columns, which pandas' ArrowDtype can't hold
+    views = {pa.string_view(): pa.large_string(), pa.binary_view(): pa.large_binary()}
+    if any(f.type in views for f in table.schema):
+        table = table.cast(pa.schema([f.with_type(views.get(f.type, f.type))
+                                      for f in table.schema]))
+    return table
+
+def arrow_table(df_: pd.DataFrame) -> pa.Table:
+    """pandas → Arrow; object columns mixing numbers and text become text."""
+    try:
+        return pa.Table.from_pandas(df_, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        df_ = df_.copy()
+        for col in df_.columns[df_.dtypes == object]:
+            df_[col] = df_[col].map(lambda v: v if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(df_, preserve_index=False)
+
+# One clean Arrow type per known report column, settled once at load so
+# st.dataframe / filters / exports never meet numbers stored as text or NaN in
+# a string column: Project and Manager as categoricals (sorted dictionary),
+# money as float64, Activity Seq as a nullable int.  Other columns keep their
+# type; all-empty ones become text.
+CATEGORY_COLS = ("Project", "Manager Description")
+MONEY_COLS = ("Estimated Revenue", "Estimated Cost", "Actual Cost", "Budget Remaining")
+INT_COLS = ("Activity Seq",)
+
+def _numeric(col: pa.ChunkedArray, target: pa.DataType) -> pa.ChunkedArray:
+    if not (pa.types.is_integer(col.type) or pa.types.is_floating(col.type)):
+        parsed = pd.to_numeric(col.to_pandas(), errors="coerce")   # "1,5" / "n/a" → null
+        col = pa.chunked_array([pa.array(parsed, type=pa.float64(), from_pandas=True)])
+    try:
+        return col.cast(target)
+    except pa.ArrowInvalid:               # e.g. a fractional Activity Seq – keep float
+        return col.cast(pa.float64())
+
+def _category(col: pa.ChunkedArray) -> pa.ChunkedArray:
+    if not pa.types.is_large_string(col.type):
+        col = col.cast(pa.large_string())
+    values = pc.unique(col).drop_null()
+    values = values.take(pc.array_sort_indices(values))          # sort/compare in order
+    indices = pc.index_in(col, value_set=values).cast(pa.int32())
+    return pa.chunked_array([pa.DictionaryArray.from_arrays(chunk, values)
+                             for chunk in indices.chunks], pa.dictionary(pa.int32(), values.type))
+
+def normalize_types(table: pa.Table) -> pa.Table:
+    columns = []
+    for name, col in zip(table.column_names, table.columns):
+        if name in MONEY_COLS:
+            col = _numeric(col, pa.float64())
+        elif name in INT_COLS:
+            col = _numeric(col, pa.int64())
+        elif name in CATEGORY_COLS:
+            col = _category(col)
+        elif pa.types.is_null(col.type):
+            col = col.cast(pa.large_string())
+        columns.append(col)
+    return pa.table(columns, names=table.column_names)
+
+def arrow_dtype(arrow_type: pa.DataType):
+    """types_mapper: Arrow-backed columns, except dictionaries → pandas Categorical."""
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+def report_frame(table: pa.Table) -> pd.DataFrame:
+    return table.to_pandas(types_mapper=arrow_dtype)
+
+def file_version(path: Path) -> tuple:
+    """(source, mtime_ns, size) of the file a default load would read."""
+    source = columnar_copy(path) or path
+    try:
+        stat = source.stat()
+    except FileNotFoundError:
+        return (str(source), 0, 0)
+    return (str(source), stat.st_mtime_ns, stat.st_size)
+
+def pt_source(folder: Path):
+    """Most recent PT export in *folder* – the file ProjectX_4_Polars would pick."""
+    files = [p for p in folder.glob("*PT*")
+             if p.suffix.lower() in (".csv", ".xlsx", ".xls", ".txt", ".dat")
+             and not p.name.startswith("~$")]
+    return max(files, key=mtime_or_zero) if files else None
+
+def mtime_or_zero(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:               # renamed / deleted since the glob
+        return 0.0
+
+def pt_version(folder: Path):
+    """(source, mtime_ns, size) of the latest PT export, or None."""
+    source = pt_source(folder)
+    if source is None:
+        return None
+    try:
+        stat = source.stat()
+    except FileNotFoundError:               # gone since pt_source – as if absent
+        return None
+    return (str(source), stat.st_mtime_ns, stat.st_size)
+
+@tallied("report_table",                 # current + pre-warmed next
+         st.cache_resource(show_spinner=False, max_entries=2))
+def report_table(source: str, mtime_ns: int, size: int) -> pa.Table:
+    """The shared, immutable copy of the report – one per process and version.
+
+    Keyed on mtime/size as well as path, so a regenerated file is a new entry.
+    """
+    path = Path(source)
+    if not size and not path.exists():
+        return pa.table({})
+    if path.suffix in (".arrow", ".parquet"):
+        return normalize_types(read_columnar(path))
+    return normalize_types(arrow_table(pd.read_excel(path, engine="openpyxl")))
+
+@tallied("read_report", st.cache_resource(show_spinner=False, max_entries=2))
+def read_report(source: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """Arrow-backed DataFrame over ``report_table`` – zero-copy, shared by all
+    sessions.  Nothing in this app mutates it; filters only build row masks."""
+    return report_frame(report_table(source, mtime_ns, size))
+
+class ReportWatcher:
+    """Polls the default report and the PT export next to it, and swaps in new
+    versions only once they are loaded *and* indexed.
+
+    ``version`` / ``pt_version`` are what every session reads.  One only moves
+    forward after its file has stopped changing for one poll and everything
+    derived from it has been built on this thread – the shared frame and its
+    filter facets, or the PT transaction index – plus the Employee Hours cube.  The swap is then a single
+    reference assignment: a rerun sees the old version or the new one, never
+    a half-loaded one, and nobody pays the reload on the request path.
+    """
+
+    def __init__(self, path: Path, interval: float = WATCH_INTERVAL_S):
+        self.path = path
+        self.interval = interval
+        self.version = file_version(path)
+        self.pt_version = pt_version(path.parent)
+        threading.Thread(target=self._run, name="report-watcher", daemon=True).start()
+
+    # facet_index / load_hours_cube are defined further down the script.
+    def warm_report(self, version: tuple):
+        report = read_report(*version)
+        facet_index(version, report)
+        load_hours_cube(self.path, report, version, self.pt_version)
+
+    def warm_pt(self, version):
+        if version is not None:
+            transaction_index(*version)
+            load_hours_cube(self.path, read_report(*self.version), self.version, version)
+
+    def _advance(self, current, latest, pending: dict, name: str, warm):
+        """The version to publish for *name* after this poll."""
+        if latest == current:
+            pending.pop(name, None)
+            return current
+        if pending.get(name) != latest:
+            pending[name] = latest          # still being written? check next poll
+            return current
+        try:
+            warm(latest)                    # load + index before swapping
+        except Exception as exc:            # half-written / locked – retry later
+            print(f"Report watcher: could not load {latest[0]}: {exc}")
+            return current
+        pending.pop(name, None)
+        return latest
+
+    def _run(self):
+        pending = {}
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.version = self._advance(self.version, file_version(self.path),
+                                             pending, "report", self.warm_report)
+                self.pt_version = self._advance(self.pt_version, pt_version(self.path.parent),
+                                                pending, "pt", self.warm_pt)
+            except OSError as exc:          # share offline, file renamed mid-poll, …
+                print(f"Report watcher: poll failed: {exc}")
+
+@st.cache_resource
+def report_watcher(path: Path) -> ReportWatcher:
+    return ReportWatcher(path)
+
+def load_default_file(path: Path):
+    """(DataFrame, version) – *version* keys everything derived from the data."""
+    version = report_watcher(path).version
+    source = Path(version[0])
+    if not version[2] and not source.exists():
+        st.sidebar.warning(f"Default file not found:\n{path}")
+        return pd.DataFrame(), version
+    st.sidebar.success(f"Loaded default file:\n{source}")
+    return read_report(*version), version
+
+def parse_upload(name: str, data: bytes) -> pa.Table:
+    """Uploaded bytes → Arrow with a multi-threaded reader.
+
+    CSV goes through pyarrow's threaded parser, Excel through Polars' calamine
+    engine when it is installed.  Files they reject (a column whose type only
+    changes deep into the CSV, no fastexcel, a workbook calamine can't parse
+    or type) fall back to pandas.
+    """
+    if name.lower().endswith((".xls", ".xlsx")):
+        if pl is not None:
+            try:
+                return plain_strings(pl.read_excel(BytesIO(data), engine="calamine").to_arrow())
+            except Exception:                 # ImportError, fastexcel / Polars read errors
+                pass
+        return arrow_table(pd.read_excel(BytesIO(data)))
+    try:
+        return csv_table(data)
+    except pa.ArrowInvalid:
+        try:
+            return arrow_table(pd.read_csv(BytesIO(data)))
+        except UnicodeDecodeError:
+            return arrow_table(pd.read_csv(BytesIO(data), encoding="latin1"))
+
+def csv_table(source) -> pa.Table:
+    """A CSV file (path) or upload (bytes) via pyarrow's threaded reader.
+
+    pyarrow reads text that isn't UTF-8 as ``binary`` columns; such files are
+    re-read as Latin-1, the encoding IFS exports names like "José" in (cf.
+    ProjectX_4_Polars.safe_read).
+    """
+    def read(**kwargs):
+        return pacsv.read_csv(pa.BufferReader(source) if isinstance(source, bytes) else source,
+                              **kwargs)
+    table = read()
+    if any(pa.types.is_binary(t) for t in table.schema.types):
+        table = read(read_options=pacsv.ReadOptions(encoding="latin1"))
+    return table
+
 def load_uploaded(upload):
-    if upload is None:
-        return pd.DataFrame()
-    if upload.name.lower().endswith((".xls", ".xlsx")):
-        return pd.read_excel(upload, engine="openpyxl")
-    return pd.read_csv(upload)
+    """(DataFrame, version) for an upload, parsed once per distinct content.
+
+    Keyed by the SHA-256 of the bytes, not the upload widget's file id, so
+    re-uploading the same file – in any session – is a cache hit.  The digest
+    itself is remembered per file id in the session, so reruns don't re-hash.
+    """
+    memo = st.session_state.get("upload_digest")
+    if memo is None or memo[0] != upload.file_id:
+        memo = st.session_state["upload_digest"] = (
+            upload.file_id, hashlib.sha256(upload.getvalue()).hexdigest())
+    digest = memo[1]
+
+    def parse():                      # only runs on a miss
+        progress = st.progress(0.1, text=f"Parsing {upload.name} …")
+        table = parse_upload(upload.name, upload.getvalue())
+        progress.progress(0.8, text=f"Parsed {table.num_rows:,} rows – building the frame …")
+        frame = report_frame(normalize_types(table))
+        progress.empty()
+        return frame
+
+    return upload_cache().get(digest, parse), ("upload", upload.name, digest)
+
+# PT transactions behind the report's Actual Cost, for the drill-down.  Held
+# once per process, sorted by Activity Seq: an activity's transactions are one
+# contiguous slice found by binary search – no full-frame filter per click.
+def seq_keys(values) -> np.ndarray:
+    """Activity Seq as float64 search keys (text → number, unparseable → NaN)."""
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64",
+                                                                       na_value=np.nan)
+
+class TransactionIndex:
+    """PT rows sorted by Activity Seq; ``lookup`` is two ``searchsorted`` calls."""
+
+    def __init__(self, frame: pd.DataFrame, seq_col: str):
+        keys = seq_keys(frame[seq_col])
+        order = np.argsort(keys, kind="stable")             # NaN keys sort last
+        self.keys = keys[order]
+        self.frame = frame.iloc[order].reset_index(drop=True)
+
+    def lookup(self, seq) -> pd.DataFrame:
+        key = seq_keys([seq])[0]
+        if np.isnan(key):
+            return self.frame.iloc[:0]
+        lo, hi = np.searchsorted(self.keys, key, "left"), np.searchsorted(self.keys, key, "right")
+        return self.frame.iloc[lo:hi]
+
+def read_pt(path: Path) -> pa.Table:
+    """The PT export as Arrow, in whatever format / encoding it was saved."""
+    suffix = path.suffix.lower()
+    if suffix in (".xlsx", ".xls"):
+        return arrow_table(pd.read_excel(path))
+    if suffix == ".csv":
+        return csv_table(path)                              # multi-threaded
+    try:
+        return arrow_table(pd.read_csv(path, sep=None, engine="python"))
+    except UnicodeDecodeError:
+        return arrow_table(pd.read_csv(path, sep=None, engine="python", encoding="latin1"))
+
+def find_column(columns, target: str):
+    """*target*'s column, ignoring case and whitespace: an exact match, else the
+    first partial one – the rule ProjectX_4_Polars.find_col costs PT with."""
+    norm = lambda name: "".join(str(name).split()).lower()
+    mapping = {norm(c): c for c in columns}
+    tgt = norm(target)
+    if tgt in mapping:
+        return mapping[tgt]
+    return next((c for n, c in mapping.items() if tgt in n or n in tgt), None)
+
+@tallied("transaction_index",
+         st.cache_resource(show_spinner="Indexing PT transactions…", max_entries=2))
+def transaction_index(source: str, mtime_ns: int, size: int):
+    """Shared TransactionIndex for one PT file version; None without Activity
+    Seq or when the file can't be read – that only turns off the drill-down and
+    the Employee Hours tab, never the report itself."""
+    try:
+        table = read_pt(Path(source))
+    except Exception as exc:                 # corrupt / unexpected export
+        print(f"PT transactions: could not read {source}: {exc}")
+        return None
+    frame = table.to_pandas(types_mapper=pd.ArrowDtype)
+    seq_col = find_column(frame.columns, "Activity Seq")   # e.g. "Project Activity Sequence"
+    if seq_col is None:
+        print(f"PT transactions: no Activity Seq column in {source} – drill-down off")
+        return None
+    return TransactionIndex(frame, seq_col)
+
+def load_transactions(path: Path):
+    """TransactionIndex of the PT export the watcher of *path* last published."""
+    version = report_watcher(path).pt_version
+    return None if version is None else transaction_index(*version)
+
+# Employee Hours as an Employee × Project × Report Code cube (Σ hours, number
+# of entries), aggregated once per source version.  The tab only ever slices
+# and re-groups this cube – never the raw transaction rows.
+HOURS_DIMS = ("Employee Description", "Project", "Report Code Description")
+
+def hours_source(path: Path):
+    """calculations.py's Employee Hours: the columnar sidecar, else the
+    workbook (read for its 'Employee Hours' sheet); None if neither exists."""
+    for ext in (".arrow", ".parquet"):
+        candidate = path.with_name(path.stem + "_employee_hours" + ext)
+        if candidate.exists() and (not path.exists() or
+                                   candidate.stat().st_mtime >= path.stat().st_mtime):
+            return candidate
+    return path if path.suffix.lower() in (".xlsx", ".xls") and path.exists() else None
+
+def hours_cube(rows: pd.DataFrame):
+    """Σ Internal Quantity and entry count per Employee × Project × Report Code.
+
+    Project falls back to Project Description (the Employee Hours sheet carries
+    only the latter).  Dimensions become categoricals; missing keys read "—".
+    """
+    dims = list(HOURS_DIMS)
+    if "Project" not in rows.columns:
+        dims[1] = "Project Description"
+    if "Internal Quantity" not in rows.columns or not set(dims).issubset(rows.columns):
+        return None
+    keys = pd.DataFrame({d: rows[d].astype("string").fillna("—").to_numpy() for d in dims})
+    keys["Hours"] = pd.to_numeric(rows["Internal Quantity"], errors="coerce").to_numpy(
+        dtype="float64", na_value=np.nan)
+    cube = (keys.groupby(dims, sort=True)["Hours"]
+                .agg(Hours="sum", Entries="size")
+                .reset_index())
+    return cube.astype({d: "category" for d in dims})
+
+# Only the default report has an Employee Hours sheet to read (uploads get no
+# Hours tab, live builds skip the sheet), so two entries hold the current and
+# the pre-warmed next version.  PT cubes of live builds are cached separately.
+@tallied("sheet_hours_cube",
+         st.cache_resource(show_spinner="Aggregating Employee Hours…", max_entries=2))
+def sheet_hours_cube(source: str, mtime_ns: int, size: int):
+    path = Path(source)
+    if path.suffix in (".arrow", ".parquet"):
+        rows = read_columnar(path).to_pandas(types_mapper=pd.ArrowDtype)
+    else:
+        try:
+            rows = pd.read_excel(path, sheet_name="Employee Hours", engine="openpyxl")
+        except ValueError:                   # report without that sheet
+            return None
+    return hours_cube(rows)
+
+def pt_hours_cube(pt_version: tuple, version: tuple, report: pd.DataFrame):
+    """The same cube straight from the PT export, with Project looked up from
+    the report by Activity Seq – for reports built without an Employee Hours
+    sheet (ProjectX_4_Polars)."""
+    cached = live_pt_hours_cube if version[0] == "live" else report_pt_hours_cube
+    return cached(pt_version, version, report)
+
+@tallied("report_pt_hours_cube",
+         st.cache_resource(show_spinner="Aggregating Employee Hours…", max_entries=2))
+def report_pt_hours_cube(pt_version: tuple, version: tuple, _report: pd.DataFrame):
+    return build_pt_hours_cube(pt_version, _report)
+
+@tallied("live_pt_hours_cube",
+         st.cache_resource(show_spinner="Aggregating Employee Hours…", max_entries=2))
+def live_pt_hours_cube(pt_version: tuple, version: tuple, _report: pd.DataFrame):
+    return build_pt_hours_cube(pt_version, _report)
+
+def build_pt_hours_cube(pt_version: tuple, report: pd.DataFrame):
+    transactions = transaction_index(*pt_version)
+    if transactions is None or not {"Project", "Activity Seq"}.issubset(report.columns):
+        return None
+    projects = pd.Series(report["Project"].to_numpy(), index=seq_keys(report["Activity Seq"]))
+    projects = projects[~projects.index.duplicated()]
+    rows = transactions.frame.copy(deep=False)
+    rows["Project"] = projects.reindex(transactions.keys).to_numpy()
+    return hours_cube(rows)
+
+def load_hours_cube(path: Path, report: pd.DataFrame, version: tuple, pt,
+                    sheet: bool = True):
+    """The Employee Hours cube, from the report's sheet or else the PT export
+    version *pt*; ``sheet=False`` skips the report's own sheet (a live build
+    has none, and the file on disk may be stale)."""
+    source = hours_source(path) if sheet else None
+    if source is not None:
+        stat = source.stat()
+        cube = sheet_hours_cube(str(source), stat.st_mtime_ns, stat.st_size)
+        if cube is not None:
+            return cube
+    if pt is None:
+        return None
+    try:
+        return pt_hours_cube(pt, version, report)
+    except Exception as exc:                 # bad PT data: no Hours tab, report unaffected
+        print(f"Employee Hours: could not aggregate {pt[0]}: {exc}")
+        return None
+
+# Live mode builds the report in process from the raw AE / PT / P exports with
+# ProjectX_4_Polars.build_report – no batch run needed.  The latest inputs are
+# re-stat'ed on each run; only changed stats are re-hashed, and only a new
+# content fingerprint rebuilds, so a refreshed download shows up on the next
+# interaction.
+def input_stats(inputs: dict) -> tuple:
+    stats = {tag: p.stat() for tag, p in inputs.items() if p}
+    return tuple((tag, str(p), stats[tag].st_mtime_ns, stats[tag].st_size) if p else (tag, None)
+                 for tag, p in inputs.items())
+
+def stats_inputs(stats: tuple) -> dict:
+    return {tag: Path(p) if p else None for tag, p, *_ in stats}
 
-df = load_default_file(DEFAULT_PATH)          # load default first
+@tallied("live_fingerprint", st.cache_resource(show_spinner=False, max_entries=4))
+def live_fingerprint(stats: tuple) -> str:
+    """ProjectX's run fingerprint (input contents + pipeline code) for *stats*."""
+    return projectx.run_fingerprint(stats_inputs(stats), {"live": True})
+
+@tallied("live_report",
+         st.cache_resource(show_spinner="Building the report from the IFS exports…", max_entries=2))
+def live_report(fingerprint: str, _stats: tuple) -> pd.DataFrame:
+    final = projectx.build_report(stats_inputs(_stats))
+    return report_frame(normalize_types(plain_strings(final.to_arrow())))
+
+def load_live(folder: Path):
+    """(DataFrame, version) built from the latest AE / PT / P files in *folder*."""
+    try:
+        stats = input_stats(projectx.source_files(folder))
+        version = ("live", live_fingerprint(stats))
+        report = live_report(version[1], stats)
+    except Exception as exc:      # nothing to report, mismatched schemas, file mid-download…
+        st.sidebar.warning(f"Live build failed: {exc}")
+        return pd.DataFrame(), ("live", None)
+    st.sidebar.success("Built live from:\n" +
+                       "\n".join(f"{tag}: {Path(p).name}" for tag, p, *_ in stats if p))
+    return report, version
+
+live = projectx is not None and st.sidebar.toggle(
+    "Build live from the IFS exports", key="live_mode",
+    help=f"Join the latest AE / PT / P files in {DEFAULT_PATH.parent} in process "
+         f"instead of reading {DEFAULT_PATH.name}.",
+)
+if live:
+    df, dataset_version = load_live(DEFAULT_PATH.parent)
+else:
+    df, dataset_version = load_default_file(DEFAULT_PATH)   # load default first
 
 # ------------------------------------------------------------------
 # 2.  Sidebar – optional override
@@ -39,76 +712,536 @@ df = load_default_file(DEFAULT_PATH)          # load default first
 with st.sidebar:
     st.header("📂 Data source")
     st.markdown(
-        "• The app loads the default file above.  \n"
+        "• The app loads the default file (or the live build) above.  \n"
         "• Upload another file here to *replace* it in this session."
     )
     uploaded = st.file_uploader(
         "Upload Excel/CSV", type=["xlsx", "xls", "csv"], key="uploader"
     )
+    engine = st.radio(
+        "Query engine", ["pandas", "DuckDB"] if duckdb else ["pandas"],
+        horizontal=True, key="engine",
+        help="DuckDB runs filters, totals and paging as SQL against one "
+             "in-memory database shared by all sessions.",
+    )
 
 if uploaded:
-    df = load_uploaded(uploaded)
+    df, dataset_version = load_uploaded(uploaded)
 
 if df.empty:
     st.stop()
+timer.mark("load")
 
 # ------------------------------------------------------------------
 # 3.  Dynamic filters
 # ------------------------------------------------------------------
-st.sidebar.header("🔎 Filter data")
-filtered = df.copy()
+# Widgets only *collect* predicates ({column: (op, *args)}); widgets left at
+# their full range add nothing.  All predicates are then AND-ed into one
+# boolean mask; the shared frame itself is never copied.
+def filter_mask(df_: pd.DataFrame, predicates: dict) -> np.ndarray:
+    mask = np.ones(len(df_), dtype=bool)
+    for col, (op, *args) in predicates.items():
+        if op == "between":
+            mask &= df_[col].between(*args).to_numpy(dtype=bool, na_value=False)
+        elif op == "isin":
+            mask &= df_[col].isin(args[0]).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+def predicate_key(predicates: dict) -> tuple:
+    """Canonical, hashable, order-independent form of *predicates*."""
+    key = []
+    for col, (op, *args) in sorted(predicates.items()):
+        if op == "isin":
+            args = [tuple(sorted(args[0], key=str))]
+        key.append((col, op, *args))
+    return tuple(key)
+
+def facet_index(version: tuple, df_: pd.DataFrame) -> dict:
+    """Everything the filter widgets need, computed once per dataset version.
+
+    One dict shared by every session (no per-call unpickling, unlike
+    cache_data), so callers must not mutate it.  Uploads and live builds are
+    cached apart from the default report, so they never evict the entry the
+    watcher pre-warmed.
+    """
+    cached = {"upload": upload_facets, "live": live_facets}.get(version[0], report_facets)
+    return cached(version, df_)
+
+@tallied("report_facets",               # current + pre-warmed next
+         st.cache_resource(show_spinner=False, max_entries=2))
+def report_facets(version: tuple, _df: pd.DataFrame) -> dict:
+    return build_facets(_df)
+
+@tallied("upload_facets", st.cache_resource(show_spinner=False, max_entries=4))
+def upload_facets(version: tuple, _df: pd.DataFrame) -> dict:
+    return build_facets(_df)
 
-for col in df.columns:
-    col_data = df[col]
+@tallied("live_facets", st.cache_resource(show_spinner=False, max_entries=2))
+def live_facets(version: tuple, _df: pd.DataFrame) -> dict:
+    return build_facets(_df)
 
-    if pd.api.types.is_numeric_dtype(col_data):
+def build_facets(df_: pd.DataFrame) -> dict:
+    """numeric / datetime columns → min and max; text columns → the distinct
+    values (factorize dictionary, sorted) with their row counts."""
+    facets = {}
+    for col in df_.columns:
+        values = df_[col]
+        if pd.api.types.is_numeric_dtype(values):
+            lo, hi = values.min(), values.max()
+            facets[col] = {"kind": "numeric",
+                           "min": float(lo) if pd.notna(lo) else np.nan,
+                           "max": float(hi) if pd.notna(hi) else np.nan}
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            facets[col] = {"kind": "datetime", "min": values.min(), "max": values.max()}
+        else:
+            codes, uniques = pd.factorize(values)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            uniques = list(uniques)
+            order = range(len(uniques))
+            try:
+                order = sorted(order, key=uniques.__getitem__)
+            except TypeError:                 # mixed numbers / text
+                order = sorted(order, key=lambda i: str(uniques[i]))
+            facets[col] = {"kind": "text",
+                           "values": [uniques[i] for i in order],
+                           "counts": {uniques[i]: int(counts[i]) for i in order}}
+    return facets
+
+# The filter state also lives in the URL (one query parameter per filtered
+# column: ?Project=PRJ001&Project=PRJ002&Actual%20Cost=0.0~5000.0), so a
+# bookmarked or shared link reopens the same view.  The URL is read once per
+# session and then only used as the widgets' initial values.
+def url_default(facet: dict, values: list):
+    """Initial widget value decoded from a URL parameter, or None if unusable."""
+    try:
+        if facet["kind"] == "text":
+            lookup = {str(v): v for v in facet["values"]}
+            return [lookup[v] for v in values if v in lookup] or None
+        lo, hi = values[0].split("~")
+        if facet["kind"] == "numeric":
+            lo, hi = max(float(lo), facet["min"]), min(float(hi), facet["max"])
+        else:
+            lo = max(pd.Timestamp(lo), facet["min"].normalize()).date()
+            hi = min(pd.Timestamp(hi), facet["max"].normalize()).date()
+        return (lo, hi) if lo <= hi else None
+    except (ValueError, IndexError, TypeError):     # hand-edited / stale link
+        return None
+
+def predicates_params(predicates: dict) -> dict:
+    """URL query parameters for *predicates* – the inverse of ``url_default``."""
+    params = {}
+    for col, (op, *args) in sorted(predicates.items()):
+        if op == "isin":
+            params[col] = sorted(map(str, args[0]))
+        elif isinstance(args[0], pd.Timestamp):
+            params[col] = [f"{args[0].date()}~{args[1].date()}"]
+        else:
+            params[col] = [f"{float(args[0])!r}~{float(args[1])!r}"]
+    return params
+
+if "url_filters" not in st.session_state:
+    st.session_state["url_filters"] = {k: st.query_params.get_all(k) for k in st.query_params}
+url_filters = st.session_state["url_filters"]
+
+st.sidebar.header("🔎 Filter data")
+predicates = {}
+
+for col, facet in facet_index(dataset_version, df).items():
+    initial = url_default(facet, url_filters[col]) if col in url_filters else None
+    if facet["kind"] == "numeric":
+        col_min, col_max = facet["min"], facet["max"]
+        if np.isnan(col_min) or col_min == col_max:   # nothing to slide
+            continue
         low, high = st.sidebar.slider(
             col,
-            float(col_data.min()), float(col_data.max()),
-            (float(col_data.min()), float(col_data.max())),
+            col_min, col_max,
+            initial or (col_min, col_max),
             format="%.2f",
         )
-        filtered = filtered[filtered[col].between(low, high)]
+        if (low, high) != (col_min, col_max):
+            predicates[col] = ("between", low, high)
 
-    elif pd.api.types.is_datetime64_any_dtype(col_data):
-        start, end = st.sidebar.date_input(
+    elif facet["kind"] == "datetime":
+        col_min, col_max = facet["min"], facet["max"]
+        if pd.isna(col_min):
+            continue
+        picked = st.sidebar.date_input(
             col,
-            (col_data.min(), col_data.max()),
-            min_value=col_data.min(), max_value=col_data.max(),
+            initial or (col_min, col_max),
+            min_value=col_min, max_value=col_max,
         )
-        filtered = filtered[(col_data >= pd.to_datetime(start)) &
-                            (col_data <= pd.to_datetime(end))]
+        if len(picked) == 2:                 # mid-selection gives a 1-tuple
+            start, end = pd.to_datetime(picked[0]), pd.to_datetime(picked[1])
+            if (start, end) != (col_min.normalize(), col_max.normalize()):
+                predicates[col] = ("between", start, end + pd.Timedelta(days=1, microseconds=-1))
 
     else:
-        opts = st.sidebar.multiselect(col, sorted(col_data.dropna().unique()))
+        counts = facet["counts"]
+        opts = st.sidebar.multiselect(col, facet["values"], default=initial,
+                                      format_func=lambda v, c=counts: f"{v}  ({c[v]:,})")
         if opts:
-            filtered = filtered[col_data.isin(opts)]
+            predicates[col] = ("isin", tuple(opts))
+
+params = predicates_params(predicates)
+if params != {k: st.query_params.get_all(k) for k in st.query_params}:
+    st.query_params.from_dict(params)
+timer.mark("filters")
+
 
 # ------------------------------------------------------------------
-# 4.  Display & download
+# 4.  Query engine
 # ------------------------------------------------------------------
-st.subheader(f"Filtered results  •  {len(filtered):,} rows")
-
-cols = st.columns(4)
-if {"Estimated Cost", "Actual Cost"}.issubset(filtered.columns):
-    cols[0].metric("Σ Estimated Cost",
-                   f"${filtered['Estimated Cost'].sum():,.0f}")
-    cols[1].metric("Σ Actual Cost",
-                   f"${filtered['Actual Cost'].sum():,.0f}")
-if "Budget Remaining" in filtered:
-    cols[2].metric("Σ Budget Remaining",
-                   f"${filtered['Budget Remaining'].sum():,.0f}")
-
-st.dataframe(filtered, use_container_width=True, height=450)
-
-if {"Project", "Budget Remaining"}.issubset(filtered.columns):
-    st.subheader("Budget Remaining by Project (top 30)")
-    chart_data = (filtered.groupby("Project", dropna=False)
-                           ["Budget Remaining"]
-                           .sum()
-                           .sort_values(ascending=False)
-                           .head(30))
-    st.bar_chart(chart_data)
+# The display fragments only talk to a *view* of the filtered rows:
+#   count() · sums(cols) · project_totals(n) · projects() · activities(project)
+#   · page(...) · frame()
+# PandasView materializes the filtered frame once (cached helpers below);
+# DuckDBView compiles the predicates to one WHERE clause and never builds the
+# filtered frame unless someone exports it.
+# Aggregates (count, sums, per-project totals) of either engine go through one
+# process-wide LRU keyed by (dataset version, canonical filter key, aggregate),
+# so a filter combination any session has already seen – e.g. a bookmarked
+# filter URL – costs a dict lookup.  PandasView's filtered row positions are
+# shared the same way.
+ACTIVITY_COLS = ("Project", "Activity", "Activity Description", "Activity Seq", "Actual Cost")
+
+class CachedAggregates:
+    """count / sums / project_totals through the shared aggregate LRU.
+
+    Engines implement ``_count``, ``_sums``, ``_activities`` and
+    ``_project_totals`` (the full, unsorted per-project series); the top-N is a
+    partial selection (``nlargest``) over the cached totals, so moving the
+    chart slider never re-aggregates or fully sorts.
+    """
+
+    def _cached(self, name, compute, *args):
+        return aggregate_cache().get((self.version, self.key, name, *args), compute)
+
+    def count(self) -> int:
+        return self._cached("count", self._count)
+
+    def sums(self, cols) -> dict:
+        cols = tuple(cols)
+        return self._cached("sums", lambda: self._sums(cols), cols)
+
+    def project_totals(self, top_n: int) -> pd.Series:
+        return self._cached("project_totals", self._project_totals).nlargest(top_n)
+
+    def projects(self) -> list:
+        """The filtered rows' projects – the index of the cached totals."""
+        totals = self._cached("project_totals", self._project_totals)
+        return sorted((p for p in totals.index if pd.notna(p)), key=str)
+
+    def activities(self, project) -> pd.DataFrame:
+        """Activity / Activity Seq / Actual Cost of *project*'s filtered rows."""
+        cols = tuple(c for c in ACTIVITY_COLS if c in self.columns)
+        return activity_cache().get((self.version, self.key, project, cols),
+                                    lambda: self._activities(project, cols))
+
+@tallied("table_order", st.cache_data(show_spinner=False, max_entries=16))
+def table_order(version: tuple, filter_key: tuple, sort_col, ascending: bool,
+                search: str, _view) -> np.ndarray:
+    """Row positions (into the shared frame) after search + sort, server-side.
+
+    Only this int array is cached; paging then slices it, so turning a page
+    never re-sorts or re-searches.
+    """
+    rows = _view.rows()
+    if search:
+        hit = np.zeros(len(rows), dtype=bool)
+        for col in _view.columns:
+            values = _view.subset([col])[col]
+            if (pd.api.types.is_numeric_dtype(values)
+                    or pd.api.types.is_datetime64_any_dtype(values)):
+                continue
+            hit |= (values.astype("string")
+                          .str.contains(search, case=False, regex=False, na=False)
+                          .to_numpy(dtype=bool, na_value=False))
+        rows = rows[hit]
+    if sort_col is not None:
+        keys = _view.df[sort_col].iloc[rows].reset_index(drop=True)
+        order = keys.sort_values(ascending=ascending, na_position="last",
+                                 kind="stable").index.to_numpy()
+        rows = rows[order]
+    return rows
+
+class PandasView(CachedAggregates):
+    """The filtered rows as positions into the shared frame – no data copy.
+
+    Columns are only gathered for the rows a component actually needs
+    (a page, the two chart columns, …).
+    """
+
+    def __init__(self, df_: pd.DataFrame, predicates: dict, version: tuple):
+        self.df, self.version, self.key = df_, version, predicate_key(predicates)
+        self.columns = list(df_.columns)
+        self._rows = result_cache().get((version, self.key), lambda: self._filter(predicates)) \
+            if predicates else None
+
+    def _filter(self, predicates: dict) -> np.ndarray:
+        rows = np.flatnonzero(filter_mask(self.df, predicates))
+        rows.flags.writeable = False          # shared by every session with this filter
+        return rows
+
+    def rows(self) -> np.ndarray:
+        return np.arange(len(self.df)) if self._rows is None else self._rows
+
+    def subset(self, cols=None) -> pd.DataFrame:
+        data = self.df if cols is None else self.df[cols]
+        return data if self._rows is None else data.iloc[self._rows]
+
+    def _count(self) -> int:
+        return len(self.df) if self._rows is None else len(self._rows)
+
+    def frame(self) -> pd.DataFrame:
+        return self.subset()
+
+    def _sums(self, cols) -> dict:
+        data = self.subset(list(cols))
+        return {c: data[c].sum() for c in cols}
+
+    def _activities(self, project, cols) -> pd.DataFrame:
+        rows = self.rows()
+        hit = (self.subset(["Project"])["Project"] == project).to_numpy(dtype=bool, na_value=False)
+        return self.df[list(cols)].iloc[rows[hit]].reset_index(drop=True)
+
+    def _project_totals(self) -> pd.Series:
+        return (self.subset(["Project", "Budget Remaining"])
+                    .groupby("Project", dropna=False, observed=True)["Budget Remaining"]
+                    .sum()
+                    .astype("float64"))
+
+    def page(self, sort_col, ascending, search, start, size):
+        rows = table_order(self.version, self.key, sort_col, ascending, search, self)
+        return len(rows), self.df.iloc[rows[start:start + size]]
+
+@tallied("duckdb_report", st.cache_resource(show_spinner=False, max_entries=2))
+def duckdb_report(version: tuple, _df: pd.DataFrame):
+    """One in-memory DuckDB table per version of the default report (or live
+    build), shared by every session.
+
+    Sessions only ever read it, each through its own ``cursor()``.
+    """
+    return duckdb_table(_df)
+
+@tallied("duckdb_upload", st.cache_resource(show_spinner=False, max_entries=2))
+def duckdb_upload(version: tuple, _df: pd.DataFrame):
+    """Same for uploads – a cache of their own, so a stream of uploads never
+    evicts the connection every default-file session shares."""
+    return duckdb_table(_df)
+
+def duckdb_table(df_: pd.DataFrame):
+    con = duckdb.connect()
+    con.register("report_arrow", pa.Table.from_pandas(df_, preserve_index=False))
+    con.execute("CREATE TABLE report AS SELECT * FROM report_arrow")
+    con.unregister("report_arrow")
+    return con
+
+def _ident(col: str) -> str:
+    return '"' + str(col).replace('"', '""') + '"'
+
+def _sql_value(v):
+    if isinstance(v, pd.Timestamp):
+        return v.to_pydatetime()
+    return v.item() if hasattr(v, "item") else v
+
+def predicates_sql(predicates: dict):
+    """(' WHERE …', params) for *predicates*; ('', []) when there are none."""
+    clauses, params = [], []
+    for col, (op, *args) in predicates.items():
+        if op == "between":
+            clauses.append(f"{_ident(col)} BETWEEN ? AND ?")
+            params += [_sql_value(args[0]), _sql_value(args[1])]
+        elif op == "isin":
+            clauses.append(f"{_ident(col)} IN ({', '.join('?' * len(args[0]))})")
+            params += [_sql_value(v) for v in args[0]]
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+class DuckDBView(CachedAggregates):
+    def __init__(self, con, predicates: dict, version: tuple, columns: list, text_cols: list):
+        self.con, self.version, self.key = con, version, predicate_key(predicates)
+        self.columns = columns
+        self.where, self.params = predicates_sql(predicates)
+        self.text_cols = text_cols
+
+    def _query(self, sql: str, where: str = None, params=None):
+        where = self.where if where is None else where
+        params = self.params if params is None else params
+        return self.con.cursor().execute(sql.format(where=where), params)
+
+    def _count(self) -> int:
+        return self._query("SELECT count(*) FROM report{where}").fetchone()[0]
+
+    def frame(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM report{where}").df()
+
+    def _activities(self, project, cols) -> pd.DataFrame:
+        where = self.where + (" AND " if self.where else " WHERE ") + '"Project" = ?'
+        return self._query(f"SELECT {', '.join(map(_ident, cols))} FROM report{{where}}",
+                           where, [*self.params, _sql_value(project)]).df()
+
+    def _sums(self, cols) -> dict:
+        select = ", ".join(f"sum({_ident(c)})" for c in cols)
+        row = self._query(f"SELECT {select} FROM report{{where}}").fetchone()
+        return {c: v or 0 for c, v in zip(cols, row)}
+
+    def _project_totals(self) -> pd.Series:
+        totals = self._query(
+            'SELECT "Project", sum("Budget Remaining") AS "Budget Remaining" '
+            "FROM report{where} GROUP BY 1"
+        ).df()
+        return totals.set_index("Project")["Budget Remaining"].astype("float64")
+
+    def page(self, sort_col, ascending, search, start, size):
+        where, params = self.where, list(self.params)
+        if search and self.text_cols:
+            hits = " OR ".join(f"contains(lower(CAST({_ident(c)} AS VARCHAR)), ?)"
+                               for c in self.text_cols)
+            where += (" AND " if where else " WHERE ") + f"({hits})"
+            params += [search.lower()] * len(self.text_cols)
+        total = self._query("SELECT count(*) FROM report{where}", where, params).fetchone()[0]
+        order = ""
+        if sort_col is not None:
+            order = f" ORDER BY {_ident(sort_col)} {'ASC' if ascending else 'DESC'} NULLS LAST"
+        rows = self._query(f"SELECT * FROM report{{where}}{order} LIMIT {int(size)} OFFSET {int(start)}",
+                           where, params).df()
+        return total, rows
+
+if engine == "DuckDB":
+    connect = duckdb_upload if uploaded else duckdb_report
+    view = DuckDBView(connect(dataset_version, df), predicates, dataset_version,
+                      list(df.columns),
+                      [c for c, f in facet_index(dataset_version, df).items() if f["kind"] == "text"])
+else:
+    view = PandasView(df, predicates, dataset_version)
+timer.mark("query engine")
+
+# ------------------------------------------------------------------
+# 5.  Display & download
+# ------------------------------------------------------------------
+# Each block is a fragment: a widget inside one (e.g. the chart's top-N
+# slider) reruns only that function with the inputs of the last full run –
+# no reload, no re-filtering, no re-sending the table.  Filter widgets in the
+# sidebar still rerun the whole page, since everything depends on them.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment")
+
+@fragment
+@timed("metrics")
+def metrics_fragment(view):
+    cols = st.columns(4)
+    money = [c for c in ("Estimated Cost", "Actual Cost", "Budget Remaining")
+             if c in view.columns]
+    sums = view.sums(money) if money else {}       # one cached aggregate for all three
+    if {"Estimated Cost", "Actual Cost"}.issubset(sums):
+        cols[0].metric("Σ Estimated Cost", f"${sums['Estimated Cost']:,.0f}")
+        cols[1].metric("Σ Actual Cost", f"${sums['Actual Cost']:,.0f}")
+    if "Budget Remaining" in sums:
+        cols[2].metric("Σ Budget Remaining", f"${sums['Budget Remaining']:,.0f}")
+
+PAGE_SIZES = (50, 100, 250, 500, 1000)
+
+@fragment
+@timed("table")
+def table_fragment(view):
+    paged = st.toggle("Paginate table (send only the visible rows)", value=True,
+                      key="table_paged")
+    if not paged:
+        st.dataframe(view.frame(), use_container_width=True, height=450)
+        return
+
+    c_search, c_sort, c_dir, c_size = st.columns([3, 2, 1, 1])
+    search = c_search.text_input("Search text columns", key="table_search").strip()
+    sort_col = c_sort.selectbox("Sort by", [None, *view.columns], key="table_sort",
+                                format_func=lambda c: "— none —" if c is None else c)
+    ascending = c_dir.radio("Order", ["↑", "↓"], horizontal=True,
+                            key="table_dir") == "↑"
+    page_size = c_size.selectbox("Rows / page", PAGE_SIZES, index=1, key="table_size")
+
+    page = st.session_state.get("table_page", 1)
+    total, rows = view.page(sort_col, ascending, search, (page - 1) * page_size, page_size)
+    n_pages = max(1, -(-total // page_size))
+    if page > n_pages:                                   # filter shrank the result
+        page = st.session_state["table_page"] = n_pages
+        total, rows = view.page(sort_col, ascending, search, (page - 1) * page_size, page_size)
+    page = st.number_input(f"Page (of {n_pages:,})", 1, n_pages, key="table_page")
+    start = (page - 1) * page_size
+    st.caption(f"Rows {start + 1 if len(rows) else 0:,}–{start + len(rows):,} of {total:,}")
+    st.dataframe(rows, use_container_width=True, height=450)
+
+@fragment
+@timed("chart")
+def chart_fragment(view):
+    if not {"Project", "Budget Remaining"}.issubset(view.columns):
+        return
+    top_n = st.slider("Projects shown", 5, 100, 30, step=5, key="chart_top_n")
+    st.subheader(f"Budget Remaining by Project (top {top_n})")
+    st.bar_chart(view.project_totals(top_n))
+
+@fragment
+@timed("drill-down")
+def drilldown_fragment(view):
+    """Project → Activity → the PT transactions behind its Actual Cost."""
+    if not {"Project", "Activity Seq", "Budget Remaining"}.issubset(view.columns):
+        return
+    transactions = load_transactions(DEFAULT_PATH)
+    if transactions is None:
+        return
+    st.subheader("Drill-down: PT transactions")
+    c_proj, c_act = st.columns(2)
+    project = c_proj.selectbox("Project", view.projects(), index=None, key="drill_project")
+    if project is None:
+        return
+    rows = view.activities(project)
+    label_cols = [c for c in ("Activity Seq", "Activity", "Activity Description") if c in rows.columns]
+    labels = {vals[0]: " · ".join(str(v) for v in vals if pd.notna(v))
+              for vals in rows[label_cols].itertuples(index=False, name=None)}
+    seq = c_act.selectbox("Activity", list(labels), index=None, key="drill_activity",
+                          format_func=labels.get)
+    if seq is None:
+        return
+    found = transactions.lookup(seq)
+    caption = f"{len(found):,} transactions"
+    if "Actual Cost" in rows.columns:
+        cost = rows.loc[(rows["Activity Seq"] == seq).to_numpy(dtype=bool, na_value=False),
+                        "Actual Cost"].sum()
+        caption += f" • Actual Cost ${cost:,.2f}"
+    st.caption(caption)
+    st.dataframe(found, use_container_width=True, hide_index=True)
+
+@fragment
+@timed("employee hours")
+def hours_fragment(cube: pd.DataFrame):
+    """Slice the Employee Hours cube; every view is a group-by over the cube."""
+    dims = [c for c in cube.columns if c not in ("Hours", "Entries")]
+    picks = st.columns(len(dims))
+    mask = np.ones(len(cube), dtype=bool)
+    for c, dim in zip(picks, dims):
+        chosen = c.multiselect(dim, list(cube[dim].cat.categories), key=f"hours_{dim}")
+        if chosen:
+            mask &= cube[dim].isin(chosen).to_numpy()
+    sliced = cube[mask]
+
+    c_rows, c_cols, c_measure = st.columns([2, 2, 1])
+    by = c_rows.selectbox("Rows", dims, key="hours_rows")
+    across = c_cols.selectbox("Columns", [None, *[d for d in dims if d != by]], key="hours_cols",
+                              format_func=lambda d: "— none —" if d is None else d)
+    measure = c_measure.radio("Measure", ["Hours", "Entries"], horizontal=True, key="hours_measure")
+
+    m = st.columns(3)
+    m[0].metric("Σ Hours", f"{sliced['Hours'].sum():,.1f}")
+    m[1].metric("Entries", f"{int(sliced['Entries'].sum()):,}")
+    m[2].metric("Employees", f"{sliced[dims[0]].nunique():,}")
+
+    totals = (sliced.groupby(by, observed=True)[measure].sum()
+                    .sort_values(ascending=False))
+    if across is None:
+        st.bar_chart(totals.head(30))
+        st.dataframe(totals, use_container_width=True)
+    else:
+        pivot = sliced.pivot_table(index=by, columns=across, values=measure,
+                                   aggfunc="sum", fill_value=0, observed=True)
+        pivot = pivot.reindex(totals.index)
+        pivot.index, pivot.columns = pivot.index.astype(str), pivot.columns.astype(str)
+        st.dataframe(pivot, use_container_width=True)
 
 def to_excel_bytes(df_):
     buffer = BytesIO()
@@ -116,12 +1249,94 @@ def to_excel_bytes(df_):
         df_.to_excel(writer, index=False, sheet_name="Filtered")
     return buffer.getvalue()
 
-st.sidebar.download_button(
-    "⬇️ Download filtered data (Excel)",
-    data=to_excel_bytes(filtered),
-    file_name="filtered_report.xlsx",
-    mime=("application/vnd.openxmlformats-officedocument."
-          "spreadsheetml.sheet"),
-)
+def to_csv_bytes(df_):
+    return df_.to_csv(index=False).encode("utf-8-sig")   # BOM so Excel opens it as UTF-8
+
+def to_parquet_bytes(df_):
+    buffer = BytesIO()
+    df_.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+EXPORT_FORMATS = {   # label -> (extension, mime, serializer); cheapest last
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument."
+                      "spreadsheetml.sheet", to_excel_bytes),
+    "CSV": ("csv", "text/csv", to_csv_bytes),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", to_parquet_bytes),
+}
+
+@tallied("export_bytes", st.cache_data(show_spinner=False, max_entries=8))
+def export_bytes(version: tuple, filter_key: tuple, fmt: str, _view) -> bytes:
+    """Serialized filtered rows – keyed on dataset version + filter state."""
+    return EXPORT_FORMATS[fmt][2](_view.frame())
+
+# Nothing is serialized until the user asks for it; the bytes are then cached
+# for this exact filter state, so reruns and repeat downloads are free.
+@fragment
+@timed("export")
+def export_fragment(view):
+    st.header("⬇️ Export")
+    export_fmt = st.radio("Format", list(EXPORT_FORMATS), horizontal=True,
+                          key="export_fmt")
+    export_state = (view.version, view.key, export_fmt)
+    if st.button(f"Prepare {export_fmt} download", key="export_prepare"):
+        st.session_state["export_state"] = export_state
+    if st.session_state.get("export_state") == export_state:
+        ext, mime, _ = EXPORT_FORMATS[export_fmt]
+        with st.spinner(f"Preparing {export_fmt} …"):
+            payload = export_bytes(*export_state, _view=view)
+        st.download_button(
+            f"⬇️ Download filtered data ({export_fmt})",
+            data=payload,
+            file_name=f"filtered_report.{ext}",
+            mime=mime,
+        )
+
+def timing_panel(record: dict):
+    """This run's section times and cache hits, plus the rolling history."""
+    history = list(st.session_state["timing_history"])
+    with st.expander(f"⏱ Timing – this run {record['total_ms']:,.0f} ms", expanded=True):
+        c_sections, c_cache = st.columns([2, 1])
+        c_sections.dataframe(pd.Series(record["sections_ms"], name="ms").round(1),
+                             use_container_width=True)
+        c_cache.dataframe(pd.DataFrame(record["cache"], index=["hits", "misses"]).T,
+                          use_container_width=True)
+        st.caption(f"Last {len(history)} reruns, ms per section "
+                   "(fragment-only reruns are separate entries)")
+        st.bar_chart(pd.DataFrame([h["sections_ms"] for h in history]).fillna(0.0))
+        st.dataframe(pd.DataFrame({
+            "at": [h["at"] for h in history],
+            "kind": [h["kind"] for h in history],
+            "total ms": [round(h["total_ms"], 1) for h in history],
+            "cache hits": [sum(hit for hit, _ in h["cache"].values()) for h in history],
+            "cache misses": [sum(miss for _, miss in h["cache"].values()) for h in history],
+        }).iloc[::-1], use_container_width=True, hide_index=True)
+
+hours = None if uploaded else load_hours_cube(
+    DEFAULT_PATH, df, dataset_version, report_watcher(DEFAULT_PATH).pt_version, sheet=not live)
+timer.mark("employee hours cube")
+tab_report, tab_hours = st.tabs(["Activity report", "Employee Hours"]) if hours is not None \
+    else (st.container(), None)
+
+with tab_report:
+    st.subheader(f"Filtered results  •  {view.count():,} rows")
+    timer.mark("row count")
+    metrics_fragment(view)
+    table_fragment(view)
+    chart_fragment(view)
+    if not uploaded:                  # the PT export belongs to the default report
+        drilldown_fragment(view)
+if tab_hours is not None:
+    with tab_hours:
+        st.caption("Employee × Project × Report Code, aggregated at load – "
+                   "the sidebar filters apply to the activity report only.")
+        hours_fragment(hours)
+with st.sidebar:
+    export_fragment(view)
+    st.toggle("⏱ Timing panel", key="timing_panel",
+              help="Time every section of each rerun and keep a rolling history "
+                   "in this session.")
+
+if timer.enabled:
+    timing_panel(timer.finish())
 
 st.sidebar.caption("© YourCompany 2025")